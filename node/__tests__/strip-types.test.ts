@@ -0,0 +1,58 @@
+import {Parser} from '../src/Parser'
+import {expect, test} from '@jest/globals';
+import * as fs from 'fs'
+import * as os from 'os'
+import * as path from 'path'
+
+const {transpile} = require('../bench/strip-types')
+
+// The sources bench/differential.js loads through the stripper.
+const sources = ['Tokenizer', 'Parser']
+
+const programs = [
+    '42',
+    '"hello"',
+    `
+    // Number: 42
+    42
+    `,
+    `
+        /**
+         * Documentation comment:
+         */
+
+        "hello"
+    `,
+    '"unterminated',
+    '',
+]
+
+function parse(parser: { parse(program: string): unknown }, program: string) {
+    try {
+        return parser.parse(program)
+    } catch (error) {
+        return {error: `${(error as Error).name}: ${(error as Error).message}`}
+    }
+}
+
+test('Stripped sources parse as the originals', () => {
+    const directory = fs.mkdtempSync(path.join(os.tmpdir(), 'strip-types-'))
+    try {
+        for (const name of sources) {
+            const source = fs.readFileSync(path.join(__dirname, '..', 'src', `${name}.ts`), 'utf8')
+            fs.writeFileSync(path.join(directory, `${name}.js`), transpile(source))
+        }
+        const stripped = require(path.join(directory, 'Parser'))
+        for (const program of programs) {
+            expect(parse(new stripped.Parser(), program)).toStrictEqual(parse(new Parser(), program))
+        }
+    } finally {
+        fs.rmSync(directory, {recursive: true})
+    }
+})
+
+test('Unterminated input', () => {
+    for (const source of ['a /* b', 'const a = "b', 'f(/b', 'function f(a: Array<string> {}']) {
+        expect(() => transpile(source)).toThrow(SyntaxError)
+    }
+})
@@ -0,0 +1,64 @@
+/**
+ * Worker for python/benchmarks/differential.py.
+ *
+ * Reads {documents, warmup} as JSON on stdin, parses every document with
+ * src/Parser.ts `warmup` times untimed and once timed, and writes
+ * {asts, latencies, rss} as JSON on stdout: one AST or {error} and one
+ * latency in nanoseconds per document, and the resident set size in bytes
+ * before parsing and at its peak.
+ *
+ * The TypeScript sources are transpiled on load, without a build step:
+ * with the project's `typescript` dev dependency when `npm install` has
+ * been run, and with the type stripping in strip-types.js otherwise, so
+ * that it also runs offline from the checked-in project alone.
+ */
+const fs = require('fs')
+
+let transpile
+try {
+    const ts = require('typescript')
+    transpile = (source, filename) => ts.transpileModule(source, {
+        compilerOptions: {module: ts.ModuleKind.CommonJS, target: ts.ScriptTarget.ES2019},
+        fileName: filename,
+    }).outputText
+} catch (error) {
+    transpile = require('./strip-types').transpile
+}
+
+require.extensions['.ts'] = (module, filename) => {
+    module._compile(transpile(fs.readFileSync(filename, 'utf8'), filename), filename)
+}
+
+const {Parser} = require('../src/Parser')
+
+function parse(parser, document) {
+    try {
+        return parser.parse(document)
+    } catch (error) {
+        return {error: `${error.name}: ${error.message}`}
+    }
+}
+
+const {documents, warmup} = JSON.parse(fs.readFileSync(0, 'utf8'))
+const parser = new Parser()
+const rss = process.memoryUsage().rss
+
+for (let round = 0; round < warmup; round++) {
+    for (const document of documents) {
+        parse(parser, document)
+    }
+}
+
+const asts = []
+const latencies = []
+for (const document of documents) {
+    const start = process.hrtime.bigint()
+    asts.push(parse(parser, document))
+    latencies.push(Number(process.hrtime.bigint() - start))
+}
+
+process.stdout.write(JSON.stringify({
+    asts,
+    latencies,
+    rss: {start: rss, peak: process.resourceUsage().maxRSS * 1024},
+}))
@@ -0,0 +1,220 @@
+/**
+ * Type stripping for the TypeScript in src/, for when the `typescript`
+ * package is not installed (it needs `npm install`, and so the network).
+ *
+ * Covers the syntax src/ uses: imports and exports, type aliases, type
+ * annotations on variables, class fields, parameters and return types,
+ * and member modifiers. The code is tokenized so that strings, template
+ * literals, regular expressions and comments are copied through as they
+ * are; everything that is not type syntax is kept byte for byte.
+ */
+
+const MODIFIERS = new Set(['private', 'public', 'protected', 'readonly'])
+const CLOSERS = {'(': ')', '[': ']', '{': '}', '<': '>'}
+// Tokens after which a `/` starts a regular expression rather than dividing.
+const BEFORE_REGEX = new Set(['(', ',', '=', ':', '[', '!', '&', '|', '?', '{', '}', ';', 'return', 'typeof'])
+
+function tokenize(source) {
+    const tokens = []
+    let previous = null
+    let i = 0
+    const take = (kind, end) => {
+        const token = {kind, text: source.slice(i, end)}
+        tokens.push(token)
+        if (kind !== 'space') {
+            previous = token.text
+        }
+        i = end
+    }
+    const unterminated = what => {
+        throw new SyntaxError(`Unterminated ${what} at offset ${i}`)
+    }
+    const skipQuoted = (end, quote) => {
+        while (end < source.length && source[end] !== quote) {
+            end += source[end] === '\\' ? 2 : 1
+        }
+        if (end >= source.length) unterminated('string')
+        return end + 1
+    }
+    while (i < source.length) {
+        const c = source[i]
+        let end = i + 1
+        if (/\s/.test(c)) {
+            while (end < source.length && /\s/.test(source[end])) end++
+            take('space', end)
+        } else if (source.startsWith('//', i)) {
+            end = source.indexOf('\n', i)
+            take('space', end < 0 ? source.length : end)
+        } else if (source.startsWith('/*', i)) {
+            end = source.indexOf('*/', i + 2)
+            if (end < 0) unterminated('comment')
+            take('space', end + 2)
+        } else if (c === '"' || c === "'" || c === '`') {
+            take('string', skipQuoted(end, c))
+        } else if (c === '/' && (previous === null || BEFORE_REGEX.has(previous))) {
+            let inClass = false
+            while (end < source.length && (inClass || source[end] !== '/')) {
+                if (source[end] === '\\') end++
+                else if (source[end] === '[') inClass = true
+                else if (source[end] === ']') inClass = false
+                end++
+            }
+            if (end >= source.length) unterminated('regular expression')
+            end++
+            while (end < source.length && /\w/.test(source[end])) end++
+            take('regex', end)
+        } else if (/[\w$]/.test(c)) {
+            while (end < source.length && /[\w$]/.test(source[end])) end++
+            take('word', end)
+        } else {
+            take('punctuation', end)
+        }
+    }
+    return tokens
+}
+
+function transpile(source) {
+    const tokens = tokenize(source)
+    const output = []
+    const exported = []
+    // One entry per open brace: is it a class body?
+    const braces = []
+    let classNext = false
+    let last = null
+
+    const next = j => {
+        while (j < tokens.length && tokens[j].kind === 'space') j++
+        return j
+    }
+    const text = j => (j < tokens.length ? tokens[j].text : null)
+    const matching = j => {
+        const start = j
+        const stack = []
+        do {
+            if (j >= tokens.length) throw new SyntaxError(`Unbalanced ${text(start)} at token ${start}`)
+            const t = text(j)
+            if (tokens[j].kind === 'punctuation' && t in CLOSERS && (t !== '<' || stack.length === 0 || stack[0] === '>')) {
+                stack.push(CLOSERS[t])
+            } else if (t === stack[stack.length - 1]) {
+                stack.pop()
+            }
+            j++
+        } while (stack.length)
+        return j
+    }
+    // Index after the type that starts at or after j.
+    const skipType = j => {
+        for (;;) {
+            j = next(j)
+            j = text(j) in CLOSERS ? matching(j) : j + 1
+            for (;;) {
+                const k = next(j)
+                if (text(k) === '[' || text(k) === '<') j = matching(k)
+                else if (text(k) === '.') j = next(k + 1) + 1
+                else break
+            }
+            const k = next(j)
+            if (text(k) !== '|' && text(k) !== '&') return j
+            j = k + 1
+        }
+    }
+    // Copies a parameter list from the `(` at j without its types, and
+    // the return type after it; returns the index after both.
+    const parameters = j => {
+        const end = matching(j)
+        let depth = 0
+        for (; j < end; j++) {
+            const t = text(j)
+            if (t === '(' || t === '[' || t === '{') depth++
+            if (t === ')' || t === ']' || t === '}') depth--
+            output.push(t)
+            if (depth === 1 && tokens[j].kind === 'word') {
+                let k = next(j + 1)
+                if (text(k) === '?') k = next(k + 1)
+                if (text(k) === ':') j = skipType(k + 1) - 1
+                else if (text(next(j + 1)) === '?') j = next(j + 1)
+            }
+        }
+        const k = next(end)
+        return text(k) === ':' ? skipType(k + 1) : end
+    }
+
+    let i = 0
+    while (i < tokens.length) {
+        const token = tokens[i]
+        const t = token.text
+        if (token.kind !== 'word' && token.kind !== 'punctuation') {
+            output.push(t)
+            i++
+            continue
+        }
+        const inClass = braces[braces.length - 1] === true
+        if (inClass && token.kind === 'word' && (last === '{' || last === '}' || last === ';')) {
+            // A class member: drop the modifiers and the type of a field.
+            let j = i
+            while (MODIFIERS.has(text(j))) j = next(j + 1)
+            const name = j
+            const after = next(name + 1)
+            if (text(after) === '(') {
+                output.push(text(name))
+                i = parameters(after)
+                last = ')'
+                continue
+            }
+            if (text(after) === ':') {
+                const end = next(skipType(after + 1))
+                if (text(end) === ';') {
+                    i = end + 1
+                    continue
+                }
+                output.push(text(name), ' ')
+                i = end
+                last = text(name)
+                continue
+            }
+            i = name
+        }
+        if (t === 'import') {
+            const open = next(i + 1)
+            const close = matching(open)
+            const from = next(next(close) + 1)
+            output.push(`const ${tokens.slice(open, close).map(token => token.text).join('')} = require(${text(from)})`)
+            i = from + 1
+            last = ')'
+        } else if (t === 'export') {
+            const j = next(i + 1)
+            if (text(j) === 'type') {
+                i = skipType(next(next(j + 1) + 1) + 1)
+                if (text(next(i)) === ';') i = next(i) + 1
+                continue
+            }
+            exported.push(text(next(j + 1)))
+            i = j
+        } else if (t === 'const' || t === 'let' || t === 'var') {
+            const name = next(i + 1)
+            output.push(t, ' ', text(name))
+            const k = next(name + 1)
+            i = text(k) === ':' ? skipType(k + 1) : name + 1
+            last = text(name)
+        } else if (t === 'function') {
+            const name = next(i + 1)
+            output.push(t, ' ', text(name))
+            i = parameters(next(name + 1))
+            last = ')'
+        } else {
+            if (t === 'class') classNext = true
+            if (t === '{') {
+                braces.push(classNext)
+                classNext = false
+            }
+            if (t === '}') braces.pop()
+            output.push(t)
+            last = t
+            i++
+        }
+    }
+    output.push(`\nmodule.exports = {${exported.join(', ')}}\n`)
+    return output.join('')
+}
+
+module.exports = {transpile}
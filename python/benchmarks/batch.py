@@ -0,0 +1,50 @@
+"""
+Snippets through one `main.py --batch` process against one `main.py -e`
+process each.
+
+    python -m benchmarks.batch [--snippets 2000] [--processes 20] [--engine dfa]
+
+The per-process run is timed over the first `processes` snippets only.
+"""
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from benchmarks.corpus import statement
+from src.tokenizer import Tokenizer
+
+main_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+def main():
+    p = ArgumentParser(description='Benchmark batch mode.')
+    p.add_argument('--snippets', type=int, default=2000, help='snippets through batch mode')
+    p.add_argument('--processes', type=int, default=20, help='snippets through separate processes')
+    p.add_argument('--engine', default='dfa', choices=Tokenizer.engines, help='tokenizer engine')
+    args = p.parse_args()
+
+    rng = random.Random(0)
+    snippets = [statement(rng) for _ in range(args.snippets)]
+
+    start = time.perf_counter()
+    for snippet in snippets[:args.processes]:
+        subprocess.run([sys.executable, main_py, '--engine', args.engine, '--format', 'json', '-e', snippet], check=True, capture_output=True)
+    separate = (time.perf_counter() - start) / args.processes
+    print(f'one process each  {separate * 1e3:9.3f} ms per snippet')
+
+    requests = ''.join(json.dumps({'id': index, 'source': snippet}) + '\n' for index, snippet in enumerate(snippets))
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, main_py, '--engine', args.engine, '--batch'], input=requests, check=True, capture_output=True,
+                            text=True).stdout
+    elapsed = time.perf_counter() - start
+    results = [json.loads(line) for line in output.splitlines()]
+    parse = sum(result['time'] for result in results) / len(results)
+    print(f'batch             {elapsed / len(snippets) * 1e3:9.3f} ms per snippet including startup, '
+          f'{parse * 1e6:8.1f} µs parsing')
+
+
+if __name__ == '__main__':
+    main()
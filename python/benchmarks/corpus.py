@@ -0,0 +1,86 @@
+"""
+Generated programs in the style of our code base: classes with methods,
+member chains, calls and loops, drawing names from a small vocabulary so
+that they repeat the way real code does.
+"""
+import random
+
+names = ['value', 'index', 'item', 'items', 'result', 'count', 'node', 'next', 'left', 'right',
+         'total', 'x', 'y', 'size', 'data', 'key', 'state', 'buffer', 'offset', 'length']
+methods = ['get', 'set', 'update', 'compute', 'render', 'push', 'pop', 'visit', 'reset', 'apply']
+classes = ['Point', 'Node', 'Tree', 'Buffer', 'Parser', 'Visitor', 'Widget', 'Store']
+
+
+def expression(rng: random.Random, depth: int = 0) -> str:
+    choice = rng.randrange(9 if depth < 3 else 4)
+    match choice:
+        case 0:
+            return str(rng.randrange(100))
+        case 1:
+            return rng.choice(names)
+        case 2:
+            return f'this.{rng.choice(names)}'
+        case 3:
+            return f'"{rng.choice(names)}"'
+        case 4:
+            return f'{expression(rng, depth + 1)} {rng.choice("+-*/")} {expression(rng, depth + 1)}'
+        case 5:
+            return f'{rng.choice(names)} {rng.choice(["<", "<=", "==", "!="])} {expression(rng, depth + 1)}'
+        case 6:
+            arguments = ', '.join(expression(rng, depth + 1) for _ in range(rng.randrange(3)))
+            return f'this.{rng.choice(methods)}({arguments})'
+        case 7:
+            return f'{rng.choice(names)}.{rng.choice(names)}[{expression(rng, depth + 1)}]'
+        case _:
+            return f'({expression(rng, depth + 1)})'
+
+
+def statement(rng: random.Random, depth: int = 0) -> str:
+    choice = rng.randrange(7 if depth < 2 else 3)
+    match choice:
+        case 0:
+            return f'let {rng.choice(names)} = {expression(rng)};'
+        case 1:
+            return f'{rng.choice(names)} = {expression(rng)};'
+        case 2:
+            return f'this.{rng.choice(names)} += {expression(rng)};'
+        case 3:
+            return f'if ({expression(rng)}) {block(rng, depth + 1)} else {block(rng, depth + 1)}'
+        case 4:
+            variable = rng.choice(names)
+            return f'for (let {variable} = 0; {variable} < {expression(rng)}; {variable} += 1) {block(rng, depth + 1)}'
+        case 5:
+            return f'while ({expression(rng)}) {block(rng, depth + 1)}'
+        case _:
+            return f'return {expression(rng)};'
+
+
+def block(rng: random.Random, depth: int) -> str:
+    return '{ ' + ' '.join(statement(rng, depth) for _ in range(rng.randrange(1, 4))) + ' }'
+
+
+def method(rng: random.Random) -> str:
+    params = ', '.join(rng.sample(names, rng.randrange(3)))
+    body = '\n    '.join(statement(rng) for _ in range(rng.randrange(2, 6)))
+    return f'  def {rng.choice(methods)}({params}) {{\n    {body}\n  }}'
+
+
+def declaration(rng: random.Random) -> str:
+    if rng.randrange(3):
+        extends = f' extends {rng.choice(classes)}' if rng.randrange(2) else ''
+        members = '\n'.join(method(rng) for _ in range(rng.randrange(1, 5)))
+        return f'class {rng.choice(classes)}{extends} {{\n{members}\n}}\n'
+    return method(rng).strip() + '\n'
+
+
+def program(size: int, seed: int = 0) -> str:
+    """
+    A program of at least `size` characters, the same for the same seed.
+    """
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        parts.append(declaration(rng))
+        length += len(parts[-1])
+    return ''.join(parts)
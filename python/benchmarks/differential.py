@@ -0,0 +1,207 @@
+"""
+Differential benchmark against the TypeScript parser in node/.
+
+    python -m benchmarks.differential [--documents 5000] [--seed 0] [--engines regex dfa]
+
+Both parsers get the same generated documents and every AST is compared.
+The TypeScript parser only knows a Program made of one numeric or string
+literal among whitespace and comments, so that is what the documents are;
+the Python AST of `<document>\\n;` is compared as Program{body: literal}.
+A small share of documents probe known differences (numbers past 2**53,
+Unicode digits and whitespace).
+
+Each implementation runs in its own process (`node node/bench/differential.js`
+and this module with --worker), so throughput, latency percentiles and
+peak RSS are reported side by side. The node side transpiles node/src
+with `typescript` after `npm install` and strips the types itself
+otherwise, so it runs offline too.
+"""
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from src.parser import Parser
+from src.tokenizer import Tokenizer
+
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+driver = os.path.join(root, 'node', 'bench', 'differential.js')
+
+words = ['value', 'hello', 'x', 'Δ', 'naïve', '日本', '🙂', '\\n', '\\', '"', "'", '*/', '//', '/*']
+
+
+def trivia(rng: random.Random) -> str:
+    parts = []
+    for _ in range(rng.randrange(4)):
+        match rng.randrange(4):
+            case 0:
+                parts.append(rng.choice([' ', '\n', '\t', '  \n  ']))
+            case 1:
+                parts.append(f'// {rng.choice(words)} {rng.choice(words)}\n')
+            case 2:
+                text = [word for word in words if word != '*/']
+                parts.append(f'/* {rng.choice(text)}\n * {rng.choice(text)} */')
+            case _:
+                parts.append('\n')
+    return ''.join(parts)
+
+
+def literal(rng: random.Random) -> str:
+    if rng.randrange(2):
+        digits = rng.choice([rng.randrange(1, 6), rng.randrange(1, 16), rng.randrange(1, 40)])
+        return str(rng.randrange(1, 10)) + ''.join(rng.choice('0123456789') for _ in range(digits - 1))
+    quote = rng.choice('\'"')
+    text = ' '.join(rng.choice([word for word in words if quote not in word]) for _ in range(rng.randrange(6)))
+    return quote + text + quote
+
+
+def edge(rng: random.Random) -> str:
+    return rng.choice([
+        str(2 ** 53 + 1),
+        '1' + '0' * 25,
+        '\u0663\u0664',
+        '\ufeff42',
+        '\u00a0"x"',
+        '\u20287',
+    ])
+
+
+def documents(count: int, seed: int, edges: float) -> list:
+    rng = random.Random(seed)
+    return [trivia(rng) + (edge(rng) if rng.random() < edges else literal(rng)) + trivia(rng)
+            for _ in range(count)]
+
+
+def parse(parser: Parser, document: str) -> dict:
+    try:
+        ast = parser.parse(document + '\n;')
+    except Exception as ex:
+        return {'error': f'{type(ex).__name__}: {ex}'}
+    return {'type': ast['type'], 'body': ast['body'][0]['expression']}
+
+
+def rss() -> int or None:
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return None
+
+
+def worker(engine: str):
+    """
+    Python side of the protocol node/bench/differential.js speaks.
+    """
+    request = json.load(sys.stdin)
+    parser = Parser(engine)
+    start_rss = rss()
+    for _ in range(request['warmup']):
+        for document in request['documents']:
+            parse(parser, document)
+    asts = []
+    latencies = []
+    for document in request['documents']:
+        start = time.perf_counter_ns()
+        asts.append(parse(parser, document))
+        latencies.append(time.perf_counter_ns() - start)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    json.dump({'asts': asts, 'latencies': latencies, 'rss': {'start': start_rss, 'peak': peak}}, sys.stdout)
+
+
+def run(command: list, request: dict, cwd: str) -> dict or None:
+    process = subprocess.run(command, input=json.dumps(request), capture_output=True, text=True, cwd=cwd)
+    if process.returncode != 0:
+        print(f'{" ".join(command)}: exit {process.returncode}\n{process.stderr.strip()}')
+        return None
+    return json.loads(process.stdout)
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def report(name: str, result: dict, characters: int):
+    latencies = sorted(result['latencies'])
+    elapsed = sum(latencies) / 1e9
+    start, peak = result['rss']['start'], result['rss']['peak']
+    print(f'{name:12s} {characters / elapsed / 1e6:7.2f} M chars/s   '
+          f'p50 {percentile(latencies, 0.5) / 1e3:7.1f}  p90 {percentile(latencies, 0.9) / 1e3:7.1f}  '
+          f'p99 {percentile(latencies, 0.99) / 1e3:7.1f}  max {latencies[-1] / 1e3:8.1f} µs   '
+          f'rss {(start or 0) / 2 ** 20:6.1f} -> {peak / 2 ** 20:6.1f} MB')
+
+
+def reason(expected: dict, actual: dict) -> str or None:
+    """
+    Why a node AST and a Python AST differ, None if they agree.
+    """
+    if 'error' in expected or 'error' in actual:
+        # Error messages are worded differently; only whether it failed counts.
+        if 'error' in expected and 'error' in actual:
+            return None
+        return 'only node fails' if 'error' in expected else 'only python fails'
+    if expected == actual:
+        return None
+    node, python = expected['body'], actual['body']
+    if node['type'] == python['type'] == 'NumericLiteral' and python['value'] > 2 ** 53 \
+            and float(python['value']) == float(node['value']):
+        return 'number past 2**53 rounded by node'
+    return 'different AST'
+
+
+def compare(documents: list, reference: dict, other: dict, name: str) -> int:
+    reasons = {}
+    for document, expected, actual in zip(documents, reference['asts'], other['asts']):
+        why = reason(expected, actual)
+        if why is not None:
+            reasons.setdefault(why, []).append((document, expected, actual))
+    print(f'{name}: {sum(map(len, reasons.values()))} of {len(documents)} ASTs differ from node')
+    for why, mismatches in reasons.items():
+        document, expected, actual = mismatches[0]
+        print(f'  {len(mismatches):6d}  {why}, e.g. {document!r}\n'
+              f'          node   {json.dumps(expected, ensure_ascii=False)}\n'
+              f'          python {json.dumps(actual, ensure_ascii=False)}')
+    return sum(map(len, reasons.values()))
+
+
+def main():
+    p = ArgumentParser(description='Compare the Python and TypeScript parsers.')
+    p.add_argument('--documents', type=int, default=5000, help='number of documents')
+    p.add_argument('--seed', type=int, default=0, help='corpus seed')
+    p.add_argument('--edges', type=float, default=0.02, help='share of documents probing known differences')
+    p.add_argument('--warmup', type=int, default=1, help='untimed rounds before the timed one')
+    p.add_argument('--engines', nargs='+', default=list(Tokenizer.engines), choices=Tokenizer.engines)
+    p.add_argument('--worker', help='internal: parse stdin with this engine', choices=Tokenizer.engines)
+    args = p.parse_args()
+
+    if args.worker:
+        worker(args.worker)
+        return
+
+    corpus = documents(args.documents, args.seed, args.edges)
+    request = {'documents': corpus, 'warmup': args.warmup}
+    characters = sum(map(len, corpus))
+    print(f'{len(corpus)} documents, {characters} characters')
+
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    node = run(['node', driver], request, os.path.dirname(driver))
+    if node is not None:
+        results['node'] = node
+    for engine in args.engines:
+        result = run([sys.executable, '-m', 'benchmarks.differential', '--worker', engine], request, here)
+        if result is not None:
+            results[f'python/{engine}'] = result
+
+    for name, result in results.items():
+        report(name, result, characters)
+    if node is not None:
+        for name, result in results.items():
+            if name != 'node':
+                compare(corpus, node, result, name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Closure-compiled evaluation against a tree walker that dispatches on
+`node['type']` at every visit.
+
+    python -m benchmarks.evaluator [--repeat 3]
+"""
+import time
+from argparse import ArgumentParser
+from src.evaluator import compile_program
+from src.parser import Parser
+
+programs = {
+    'for loop': '''
+        let total = 0;
+        for (let i = 0; i < 200000; i += 1) { total += i * 2 - 1; }
+    ''',
+    'while loop': '''
+        let i = 0, n = 0;
+        while (i < 200000) { if (i * 3 > 100) { n += 1; } else { n -= 1; } i += 1; }
+    ''',
+    'calls': '''
+        def fib(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+        let x = fib(20);
+    ''',
+    'methods': '''
+        class Counter {
+            def constructor() { this.count = 0; }
+            def add(n) { this.count += n; return this; }
+        }
+        let c = new Counter();
+        for (let i = 0; i < 50000; i += 1) { c.add(i); c.add(1); }
+    ''',
+}
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+class TreeWalker:
+    """
+    The baseline: environments are dicts chained through '__parent__'.
+    """
+
+    def run(self, ast):
+        env = {'__parent__': None}
+        for statement in ast['body']:
+            self.visit(statement, env)
+        return env
+
+    def visit(self, node, env):
+        return getattr(self, node['type'])(node, env)
+
+    def _lookup(self, env, name):
+        while name not in env:
+            env = env['__parent__']
+        return env
+
+    def BlockStatement(self, node, env):
+        inner = {'__parent__': env}
+        for statement in node['body']:
+            self.visit(statement, inner)
+
+    def ExpressionStatement(self, node, env):
+        self.visit(node['expression'], env)
+
+    def VariableStatement(self, node, env):
+        for declaration in node['declarations']:
+            init = declaration['init']
+            env[declaration['id']['name']] = self.visit(init, env) if init is not None else None
+
+    def IfStatement(self, node, env):
+        if self.visit(node['test'], env):
+            self.visit(node['consequent'], env)
+        elif node['alternate'] is not None:
+            self.visit(node['alternate'], env)
+
+    def WhileStatement(self, node, env):
+        while self.visit(node['test'], env):
+            self.visit(node['body'], env)
+
+    def ForStatement(self, node, env):
+        inner = {'__parent__': env}
+        self.visit(node['init'], inner)
+        while self.visit(node['test'], inner):
+            self.visit(node['body'], inner)
+            self.visit(node['update'], inner)
+
+    def ReturnStatement(self, node, env):
+        raise _Return(self.visit(node['argument'], env))
+
+    def FunctionDeclaration(self, node, env):
+        env[node['name']['name']] = ('function', node, env)
+
+    def ClassDeclaration(self, node, env):
+        methods = {member['name']['name']: ('function', member, env) for member in node['body']['body']}
+        env[node['id']['name']] = ('class', methods)
+
+    def NumericLiteral(self, node, env):
+        return node['value']
+
+    def Identifier(self, node, env):
+        return self._lookup(env, node['name'])[node['name']]
+
+    def ThisExpression(self, node, env):
+        return self._lookup(env, '__this__')['__this__']
+
+    def BinaryExpression(self, node, env):
+        left = self.visit(node['left'], env)
+        right = self.visit(node['right'], env)
+        match node['operator']:
+            case '+': return left + right
+            case '-': return left - right
+            case '*': return left * right
+            case '/': return left / right
+            case '<': return left < right
+            case '<=': return left <= right
+            case '>': return left > right
+            case '>=': return left >= right
+            case '==': return left == right
+            case '!=': return left != right
+
+    def AssignmentExpression(self, node, env):
+        value = self.visit(node['right'], env)
+        target = node['left']
+        if target['type'] == 'MemberExpression':
+            holder, key = self.visit(target['object'], env), target['property']['name']
+        else:
+            holder, key = self._lookup(env, target['name']), target['name']
+        match node['operator']:
+            case '+=': value = holder[key] + value
+            case '-=': value = holder[key] - value
+            case '*=': value = holder[key] * value
+        holder[key] = value
+        return value
+
+    def MemberExpression(self, node, env):
+        return self.visit(node['object'], env)[node['property']['name']]
+
+    def _call(self, function, this, args):
+        _, node, closure = function
+        env = {'__parent__': closure, '__this__': this}
+        for param, arg in zip(node['params'], args):
+            env[param['name']] = arg
+        try:
+            self.visit(node['body'], env)
+        except _Return as result:
+            return result.value
+
+    def CallExpression(self, node, env):
+        args = [self.visit(argument, env) for argument in node['arguments']]
+        callee = node['callee']
+        if callee['type'] == 'MemberExpression':
+            this = self.visit(callee['object'], env)
+            return self._call(this['__class__'][1][callee['property']['name']], this, args)
+        return self._call(self.visit(callee, env), None, args)
+
+    def NewExpression(self, node, env):
+        cls = self.visit(node['callee'], env)
+        this = {'__class__': cls}
+        self._call(cls[1]['constructor'], this, [self.visit(argument, env) for argument in node['arguments']])
+        return this
+
+
+def main():
+    p = ArgumentParser(description='Benchmark the closure-compiling evaluator.')
+    p.add_argument('--repeat', type=int, default=3)
+    args = p.parse_args()
+
+    for name, source in programs.items():
+        ast = Parser().parse(source)
+        timings = {}
+        for label, run in (('tree walker', lambda: TreeWalker().run(ast)),
+                           ('closures', compile_program(ast, {}))):
+            timings[label] = min(_time(run) for _ in range(args.repeat))
+        speedup = timings['tree walker'] / timings['closures']
+        print(f'{name:12s} walker {timings["tree walker"]:7.3f} s  closures {timings["closures"]:7.3f} s  '
+              f'{speedup:5.1f}x')
+
+
+def _time(run) -> float:
+    start = time.perf_counter()
+    run()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Cross-document lookups: walking every AST again against querying a
+memory-mapped index.
+
+    python -m benchmarks.index [--documents 10000] [--size 1024]
+
+Size is in characters of generated source per document.
+"""
+import os
+import tempfile
+import time
+from argparse import ArgumentParser
+from benchmarks.corpus import program, methods
+from src.index import Index, IndexBuilder
+from src.parser import Parser
+from src.visitor import Visitor
+
+
+def callee(node) -> str or None:
+    # Names as the index files calls under them.
+    if node['type'] == 'Identifier':
+        return node['name']
+    if node['type'] == 'MemberExpression' and not node['computed']:
+        return node['property']['name']
+    if node['type'] == 'Super':
+        return 'super'
+    return None
+
+
+class Calls(Visitor):
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+
+    def visit_CallExpression(self, node):
+        if callee(node['callee']) == self.name:
+            self.count += 1
+
+
+def rewalk(asts: dict, name: str) -> list:
+    found = []
+    for document, ast in asts.items():
+        calls = Calls(name)
+        calls.walk(ast)
+        if calls.count:
+            found.append((document, calls.count))
+    return found
+
+
+def main():
+    p = ArgumentParser(description='Benchmark the AST index.')
+    p.add_argument('--documents', type=int, default=10000, help='number of documents')
+    p.add_argument('--size', type=int, default=1024, help='characters per document')
+    args = p.parse_args()
+
+    parser = Parser('dfa')
+    asts = {f'doc{seed}': parser.parse(program(args.size, seed)) for seed in range(args.documents)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'ast.index')
+        start = time.perf_counter()
+        builder = IndexBuilder()
+        for document, ast in asts.items():
+            builder.add(document, ast)
+        builder.write(path)
+        print(f'build  {time.perf_counter() - start:8.3f} s  {os.path.getsize(path) / 1024:8.1f} KB')
+
+        start = time.perf_counter()
+        with Index(path) as index:
+            opened = time.perf_counter() - start
+            print(f'open   {opened * 1e3:8.3f} ms')
+            for name in methods[:3]:
+                start = time.perf_counter()
+                expected = rewalk(asts, name)
+                walked = time.perf_counter() - start
+                start = time.perf_counter()
+                found = index.calls(name)
+                queried = time.perf_counter() - start
+                assert found == expected
+                print(f'calls({name!r}): {len(found)} documents, re-walk {walked * 1e3:8.1f} ms, '
+                      f'index {queried * 1e3:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
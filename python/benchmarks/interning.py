@@ -0,0 +1,63 @@
+"""
+Memory retained by identifier names and string values in the AST, with
+the interning symbol table against one string per occurrence, and the
+cost of comparing names in a later pass.
+
+    python -m benchmarks.interning [--size 1]
+
+Size is in MB of generated source.
+"""
+import sys
+import time
+from argparse import ArgumentParser
+from benchmarks.corpus import program
+from benchmarks.tokenizer import MB
+from src.parser import Parser
+
+
+def strings(node, found: list):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ('name', 'value') and isinstance(value, str):
+                found.append(value)
+            else:
+                strings(value, found)
+    elif isinstance(node, list):
+        for item in node:
+            strings(item, found)
+
+
+def main():
+    p = ArgumentParser(description='Benchmark identifier and string interning.')
+    p.add_argument('--size', type=float, default=1.0, help='source size in MB')
+    args = p.parse_args()
+
+    parser = Parser('dfa')
+    ast = parser.parse(program(int(args.size * MB)))
+    found = []
+    strings(ast, found)
+
+    shared = sum(sys.getsizeof(value) for value in {id(value): value for value in found}.values())
+    # Without interning every occurrence but the cached one-character
+    # strings would be a string of its own.
+    separate = sum(sys.getsizeof(value) for value in found if len(value) > 1) \
+        + sum(sys.getsizeof(value) for value in {value for value in found if len(value) <= 1})
+    print(f'occurrences     {len(found):12d}')
+    print(f'distinct        {len(parser.symbols.identifiers) + len(parser.symbols.strings):12d}')
+    print(f'shared strings  {shared:12d} bytes')
+    print(f'one per use     {separate:12d} bytes')
+    print(f'saved           {separate - shared:12d} bytes ({1 - shared / separate:.1%})')
+
+    # A later pass matching every occurrence against the name it stands
+    # for: an identity check when interned, a character compare otherwise.
+    copies = [(value + ' ')[:-1] for value in found]
+    for label, values in (('interned', found), ('copies', copies)):
+        start = time.perf_counter()
+        for _ in range(20):
+            for value, name in zip(values, found):
+                value == name
+        print(f'compare {label:8s} {time.perf_counter() - start:9.3f} s')
+
+
+if __name__ == '__main__':
+    main()
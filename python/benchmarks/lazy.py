@@ -0,0 +1,53 @@
+"""
+Skimming declarations with deferred bodies against a full parse.
+
+    python -m benchmarks.lazy [--size 1] [--engine dfa] [--repeat 3]
+
+Size is in MB of generated source; each case reports its best of the
+repeats.
+"""
+import time
+from argparse import ArgumentParser
+from benchmarks.corpus import program
+from benchmarks.tokenizer import MB
+from src.parser import Parser
+
+
+def walk(node):
+    if isinstance(node, dict):
+        for value in node.values():
+            walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            walk(item)
+
+
+def declarations(ast: dict) -> list:
+    return [(statement.get('id') or statement.get('name'))['name'] for statement in ast['body']]
+
+
+def main():
+    p = ArgumentParser(description='Benchmark lazy parsing of function and class bodies.')
+    p.add_argument('--size', type=float, default=1.0, help='source size in MB')
+    p.add_argument('--engine', default='dfa')
+    p.add_argument('--repeat', type=int, default=3)
+    args = p.parse_args()
+
+    source = program(int(args.size * MB))
+    cases = {
+        'eager: declarations': (False, declarations),
+        'lazy: declarations': (True, declarations),
+        'eager: full walk': (False, walk),
+        'lazy: full walk': (True, walk),
+    }
+    for name, (lazy, use) in cases.items():
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            use(Parser(args.engine, lazy=lazy).parse(source))
+            best = min(best, time.perf_counter() - start)
+        print(f'{name:22s} {best:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Parsing number-heavy input with each `numbers` mode.
+
+    python -m benchmarks.numbers [--size 1] [--digits 20 5000]
+
+Size is in MB of generated source; each run fills it with literals of
+the given number of digits.
+"""
+import random
+import time
+from argparse import ArgumentParser
+from benchmarks.tokenizer import MB
+from src.numeric import integer
+from src.parser import Parser
+
+
+def data(size: int, digits: int) -> str:
+    rng = random.Random(digits)
+    literal = ''.join(rng.choice('0123456789') for _ in range(digits)) + ';\n'
+    return literal * max(1, size // len(literal))
+
+
+def main():
+    p = ArgumentParser(description='Benchmark numeric literal conversion.')
+    p.add_argument('--size', type=float, default=1.0, help='source size in MB')
+    p.add_argument('--digits', type=int, nargs='+', default=[20, 5000, 100000], help='digits per literal')
+    args = p.parse_args()
+
+    for digits in args.digits:
+        source = data(int(args.size * MB), digits)
+        print(f'{digits} digits')
+        for numbers in Parser.numbers:
+            start = time.perf_counter()
+            ast = Parser('dfa', numbers=numbers).parse(source)
+            parsed = time.perf_counter() - start
+            start = time.perf_counter()
+            for statement in ast['body']:
+                integer(statement['expression']['value'])
+            converted = time.perf_counter() - start
+            print(f'  {numbers:5s} parse {parsed:7.3f} s  then every value {converted:7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+"""
+Tokenizer engines on large inputs, from 1 MB up to 1 GB.
+
+    python -m benchmarks.prescan [--sizes 1,10,100,1000] [--engines regex,dfa,numpy]
+
+Sizes are in MB. An engine is not run on larger sizes once it exceeds
+the time budget.
+"""
+from argparse import ArgumentParser
+from benchmarks.tokenizer import benchmark
+from src.tokenizer import Tokenizer
+
+inputs = {
+    'whitespace': lambda size: ('x' + ' ' * 255) * (size // 256),
+    'long identifiers': lambda size: ('a' * 4095 + ' ') * (size // 4096),
+    'program': lambda size: ('let value = this.items[index] + other;\n' * (size // 40 + 1))[:size],
+}
+
+
+def main():
+    p = ArgumentParser(description='Benchmark tokenizer engines on large inputs.')
+    p.add_argument('--sizes', default='1,10,100,1000', help='input sizes in MB')
+    p.add_argument('--engines', default=','.join(Tokenizer.engines))
+    p.add_argument('--budget', type=float, default=60.0,
+                   help='skip larger sizes once an engine exceeds this many seconds')
+    args = p.parse_args()
+
+    benchmark(inputs, [float(size) for size in args.sizes.split(',')], args.engines.split(','), args.budget)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Scope resolution throughput over a generated program.
+
+    python -m benchmarks.scope [--size 1]
+
+Size is in MB of generated source.
+"""
+import time
+from argparse import ArgumentParser
+from benchmarks.corpus import program
+from benchmarks.tokenizer import MB
+from src.parser import Parser
+from src.scope import resolve
+
+
+def main():
+    p = ArgumentParser(description='Benchmark scope resolution.')
+    p.add_argument('--size', type=float, default=1.0, help='source size in MB')
+    args = p.parse_args()
+
+    source = program(int(args.size * MB))
+    start = time.perf_counter()
+    ast = Parser('dfa').parse(source)
+    parsed = time.perf_counter() - start
+    start = time.perf_counter()
+    resolution = resolve(ast)
+    resolved = time.perf_counter() - start
+    print(f'parse    {parsed:7.3f} s')
+    print(f'resolve  {resolved:7.3f} s  {len(resolution.identifiers)} identifiers, {len(resolution.names)} bindings, '
+          f'{len(resolution.parents)} scopes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Tokenizer engines on adversarial inputs.
+
+    python -m benchmarks.tokenizer [--sizes 1,2,5,10] [--engines regex,dfa]
+
+Sizes are in MB. Prints the time per input and per MB; a linear engine
+keeps the per-MB figure flat as the input grows.
+"""
+import time
+from argparse import ArgumentParser
+from src.tokenizer import Tokenizer
+
+MB = 1 << 20
+
+inputs = {
+    'unterminated comment': lambda size: 'x /* ' + 'a' * size,
+    'unterminated comment openers': lambda size: '/* ' * (size // 3),
+    'unterminated string': lambda size: "x = '" + ' ' * size,
+    'program': lambda size: ('let x = a.b(1, "s") /* c */ + 2; // d\n' * (size // 38 + 1))[:size],
+}
+
+
+def tokenize(string: str, engine: str) -> int:
+    tokenizer = Tokenizer(string, engine)
+    count = 0
+    try:
+        while tokenizer.get_next_token() is not None:
+            count += 1
+    except SyntaxError:
+        pass
+    return count
+
+
+def benchmark(inputs: dict, sizes: list[float], engines: list[str], budget: float):
+    """
+    Tokenizes each of `inputs`, made at each size in MB, with each engine
+    and prints the times. An engine is not run on larger sizes once it
+    takes more than `budget` seconds.
+    """
+    for name, make in inputs.items():
+        print(name)
+        for engine in engines:
+            for size in sizes:
+                string = make(int(size * MB))
+                start = time.perf_counter()
+                tokenize(string, engine)
+                elapsed = time.perf_counter() - start
+                print(f'  {engine:8s} {size:6g} MB {elapsed:9.3f} s {elapsed / size:9.3f} s/MB')
+                if elapsed > budget:
+                    break
+
+
+def main():
+    p = ArgumentParser(description='Benchmark tokenizer engines.')
+    p.add_argument('--sizes', default='1,2,5,10', help='input sizes in MB')
+    p.add_argument('--engines', default=','.join(Tokenizer.engines))
+    p.add_argument('--budget', type=float, default=60.0,
+                   help='skip larger sizes once an engine exceeds this many seconds')
+    args = p.parse_args()
+
+    benchmark(inputs, [float(size) for size in args.sizes.split(',')], args.engines.split(','), args.budget)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Full-tree walks: the Visitor against a hand-written recursive walk over
+every value of every node.
+
+    python -m benchmarks.visitor [--size 1] [--repeat 3]
+
+Size is in MB of generated source.
+"""
+import time
+from argparse import ArgumentParser
+from collections.abc import Mapping
+from benchmarks.corpus import program
+from benchmarks.tokenizer import MB
+from src.parser import Parser
+from src.visitor import Visitor
+
+
+def recursive(node) -> int:
+    if isinstance(node, (list, tuple)):
+        return sum(recursive(item) for item in node)
+    if not isinstance(node, Mapping):
+        return 0
+    return 1 + sum(recursive(value) for value in node.values())
+
+
+class Counter(Visitor):
+
+    def __init__(self):
+        self.count = 0
+
+    def visit_Identifier(self, node):
+        self.count += 1
+
+
+def counted(ast) -> int:
+    counter = Counter()
+    counter.walk(ast)
+    return counter.count
+
+
+def main():
+    p = ArgumentParser(description='Benchmark AST walks.')
+    p.add_argument('--size', type=float, default=1.0, help='source size in MB')
+    p.add_argument('--repeat', type=int, default=3, help='best of this many runs')
+    args = p.parse_args()
+
+    for hash_cons in (False, True):
+        ast = Parser('dfa', hash_cons=hash_cons).parse(program(int(args.size * MB)))
+        nodes = recursive(ast)
+        print(f'{"hash-consed" if hash_cons else "dicts"}: {nodes} nodes')
+        for name, walk in (('recursive', recursive), ('visitor', counted)):
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                walk(ast)
+                best = min(best, time.perf_counter() - start)
+            print(f'  {name:10s} {best:7.3f} s  {nodes / best / 1e6:6.2f} M nodes/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Incremental updates against parsing the whole file again.
+
+    python -m benchmarks.watch [--size 0.1] [--edits 20] [--engine regex]
+
+Size is in MB of generated source. Each edit swaps one number of the
+program for another, at a random place, and the file is brought up to
+date both ways.
+"""
+import random
+import re
+import time
+from argparse import ArgumentParser
+from benchmarks.corpus import program
+from benchmarks.tokenizer import MB
+from src.parser import Parser
+from src.tokenizer import Tokenizer
+from src.watch import SourceFile
+
+
+def main():
+    p = ArgumentParser(description='Benchmark incremental reparsing.')
+    p.add_argument('--size', type=float, default=0.1, help='source size in MB')
+    p.add_argument('--edits', type=int, default=20, help='number of edits')
+    p.add_argument('--engine', default='regex', choices=Tokenizer.engines)
+    args = p.parse_args()
+
+    rng = random.Random(0)
+    text = program(int(args.size * MB))
+    numbers = [match.span() for match in re.finditer(r'\b\d+\b', text)]
+    source = SourceFile(args.engine)
+    source.update(text)
+    parser = Parser(args.engine)
+
+    incremental = full = 0.0
+    replaced = 0
+    for _ in range(args.edits):
+        start, end = rng.choice(numbers)
+        text = text[:start] + ''.join(rng.choice('123456789') for _ in range(end - start)) + text[end:]
+        begin = time.perf_counter()
+        delta = source.update(text)
+        incremental += time.perf_counter() - begin
+        replaced += delta.removed
+        begin = time.perf_counter()
+        parser.parse(text)
+        full += time.perf_counter() - begin
+    print(f'{len(text)} characters, {len(source.statements)} statements, {args.edits} edits')
+    print(f'incremental {incremental / args.edits * 1e3:8.2f} ms/edit  {replaced / args.edits:5.1f} statements replaced')
+    print(f'full        {full / args.edits * 1e3:8.2f} ms/edit')
+
+
+if __name__ == '__main__':
+    main()
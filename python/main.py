@@ -1,8 +1,15 @@
 import yaml
 import json
 import sys
+import time
 from argparse import ArgumentParser, Namespace
-from src.parser import Parser
+from typing import TextIO
+from src.memory import MemoryProfile
+from src.numeric import NumericValue
+from src.optimizer import fold
+from src.parser import LimitExceeded, Parser
+from src.tokenizer import Tokenizer
+from src.watch import Watcher
 
 
 def arguments() -> Namespace:
@@ -10,19 +17,123 @@ def arguments() -> Namespace:
     p.add_argument('-e', '--expression', help='parse expression')
     p.add_argument('-f', '--file', help='parse file')
     p.add_argument('--format', help='output format', default='yaml', choices=['yaml', 'json'])
+    p.add_argument('--engine', help='tokenizer engine', default='regex', choices=Tokenizer.engines)
+    p.add_argument('--fold', help='fold constant expressions', action='store_true')
+    p.add_argument('--numbers', help='numeric literal values', default='int', choices=Parser.numbers)
+    p.add_argument('--batch', help='parse NDJSON requests {"id", "source"} from stdin into NDJSON results',
+                   action='store_true')
+    p.add_argument('--watch', metavar='DIR', help='keep the files under DIR parsed and print NDJSON change events')
+    p.add_argument('--pattern', help='file name pattern for --watch', default='*.lt')
+    p.add_argument('--max-input-size', type=int, help='fail on longer input, in characters')
+    p.add_argument('--max-tokens', type=int, help='fail on input with more tokens')
+    p.add_argument('--max-nodes', type=int, help='fail on input with more AST nodes')
+    p.add_argument('--max-depth', type=int, help='fail on deeper nested input')
+    p.add_argument('--memory-profile', help='report peak memory per phase and the top allocating productions '
+                                            'on stderr', action='store_true')
     args = p.parse_args()
+    if args.watch and any(getattr(args, name) is not None
+                          for name in ('max_input_size', 'max_tokens', 'max_nodes', 'max_depth')):
+        # Files are parsed again a few statements at a time as they change.
+        p.error('the --max-* limits do not apply to --watch')
     return args
 
 
+yaml.add_representer(NumericValue, lambda dumper, value: dumper.represent_int(value.value))
+
+
 def dumper(format, ast):
     if format == 'yaml':
         return yaml.dump(ast, sort_keys=False)
     else:
-        return json.dumps(ast, indent=2, sort_keys=False)
+        return json.dumps(ast, indent=2, sort_keys=False, default=int)
+
+
+def batch(parser: Parser, fold_constants: bool, requests: TextIO, results: TextIO, limits: dict or None = None):
+    """
+    Parses one {"id", "source"} request per line and writes one result
+    per line as soon as it is ready: {"id", "ast", "time"} or, if the
+    request could not be parsed, {"id", "error", "time"}, with the parse
+    time in seconds. `limits` are passed on to `Parser.parse`.
+    """
+    limits = limits or {}
+    for line in requests:
+        if not line.strip():
+            continue
+        start = time.perf_counter()
+        result = {'id': None}
+        try:
+            request = json.loads(line)
+            result['id'] = request.get('id')
+            ast = parser.parse(request['source'], **limits)
+            result['ast'] = fold(ast) if fold_constants else ast
+        except Exception as ex:
+            result['error'] = f'{type(ex).__name__}: {ex}'
+        result['time'] = time.perf_counter() - start
+        results.write(json.dumps(result, ensure_ascii=False, default=int))
+        results.write('\n')
+        results.flush()
+
+
+def watch(watcher: Watcher, fold_constants: bool, results: TextIO):
+    """
+    Writes one event per line for every change under the watched
+    directory, as in `Watcher`, until interrupted.
+    """
+    try:
+        for event in watcher.events():
+            if fold_constants and 'inserted' in event:
+                event['inserted'] = [fold(statement) for statement in event['inserted']]
+            results.write(json.dumps(event, ensure_ascii=False, default=int))
+            results.write('\n')
+            results.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def profile_memory(parser: Parser, expression: str, limits: dict, args: Namespace):
+    """
+    Tokenizes, parses and dumps `expression` as `main` does, then reports
+    the memory each phase took on stderr. The input size and token limits
+    hold for the tokenize phase too.
+    """
+    max_input_size = limits.get('max_input_size')
+    if max_input_size is not None and len(expression) > max_input_size:
+        raise LimitExceeded('max_input_size', max_input_size)
+    max_tokens = limits.get('max_tokens')
+    profile = MemoryProfile()
+    with profile.phase('tokenize'):
+        tokens = []
+        Tokenizer(expression, args.engine).read_tokens(tokens, len(expression) + 1 if max_tokens is None
+                                                       else max_tokens + 1)
+    if max_tokens is not None and len(tokens) > max_tokens:
+        raise LimitExceeded('max_tokens', max_tokens)
+    del tokens
+    with profile.phase('parse'):
+        ast = parser.parse(expression, **limits)
+        if args.fold:
+            ast = fold(ast)
+    # YAML and JSON allocate outside src/; only the peak tells anything.
+    with profile.phase('dump', productions=False):
+        out = dumper(args.format, ast)
+    print(out)
+    print(profile.report(), file=sys.stderr)
 
 
 def main():
     args = arguments()
+    # Parsing takes literals of any length; so must printing them.
+    if hasattr(sys, 'set_int_max_str_digits'):
+        sys.set_int_max_str_digits(0)
+    limits = {name: getattr(args, name) for name in ('max_input_size', 'max_tokens', 'max_nodes', 'max_depth')
+              if getattr(args, name) is not None}
+    if args.batch:
+        batch(Parser(args.engine, numbers=args.numbers), args.fold, sys.stdin, sys.stdout, limits)
+        return
+    if args.watch:
+        watch(Watcher(args.watch, args.pattern, args.engine, numbers=args.numbers), args.fold, sys.stdout)
+        return
     if args.expression:
         expression = args.expression
     elif args.file:
@@ -31,10 +142,17 @@ def main():
     else:
         expression = sys.stdin.read()
 
-    parser = Parser()
-    ast = parser.parse(expression)
-    out = dumper(args.format, ast)
-    print(out)
+    parser = Parser(args.engine, numbers=args.numbers)
+    try:
+        if args.memory_profile:
+            profile_memory(parser, expression, limits, args)
+        else:
+            ast = parser.parse(expression, **limits)
+            if args.fold:
+                ast = fold(ast)
+            print(dumper(args.format, ast))
+    except LimitExceeded as ex:
+        sys.exit(f'{ex} (--{ex.limit.replace("_", "-")})')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,46 @@
+from typing import Callable
+
+
+class DeferredBlock(dict):
+    """
+    BlockStatement whose statements have only been brace-matched.
+
+    The block holds nothing but its type until it is first read, then
+    parses its source span and fills itself in; from there on it is a
+    plain dict node. Syntax errors inside the block surface on that first
+    read.
+    """
+
+    def __init__(self, span: tuple[int, int], parse: Callable[[], dict]):
+        super().__init__(type='BlockStatement')
+        self.span: tuple[int, int] = span
+        self._parse: Callable[[], dict] or None = parse
+
+    @property
+    def parsed(self) -> bool:
+        return self._parse is None
+
+    def _force(self):
+        parse, self._parse = self._parse, None
+        try:
+            dict.update(self, parse())
+        except BaseException:
+            self._parse = parse
+            raise
+
+
+def _forcing(method):
+    def wrapper(self, *args, **kwargs):
+        if self._parse is not None:
+            self._force()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in ('__getitem__', '__iter__', '__len__', '__contains__', '__eq__', '__ne__', '__repr__',
+              '__setitem__', '__delitem__', 'get', 'keys', 'items', 'values', 'copy',
+              'pop', 'popitem', 'setdefault', 'update', 'clear'):
+    setattr(DeferredBlock, _name, _forcing(getattr(dict, _name)))
@@ -0,0 +1,336 @@
+import re
+from array import array
+
+# Alphabet of the automaton: the 128 ASCII code points followed by four
+# symbols that stand for every non-ASCII character of a category. The spec
+# only tells non-ASCII characters apart by `\s`, `\d` and `\w`, so one
+# representative per category is enough to decide a character class.
+_NON_ASCII_SPACE = 128
+_NON_ASCII_DIGIT = 129
+_NON_ASCII_WORD = 130
+_NON_ASCII_OTHER = 131
+
+_SYMBOLS: list[str] = [chr(code) for code in range(128)] + [' ', '٣', 'é', '§']
+
+
+def _category(char: str) -> int:
+    """
+    Alphabet symbol of a non-ASCII character, following the
+    definitions `re` uses for `\\s`, `\\d` and `\\w` on str patterns.
+    """
+    if char.isspace():
+        return _NON_ASCII_SPACE
+    if char.isdecimal():
+        return _NON_ASCII_DIGIT
+    if char.isalnum():
+        return _NON_ASCII_WORD
+    return _NON_ASCII_OTHER
+
+
+class _NFA:
+    """
+    Thompson NFA. Every state has at most one labelled edge and any
+    number of epsilon edges.
+    """
+
+    def __init__(self):
+        self.labels: list[frozenset or None] = []
+        self.targets: list[int] = []
+        self.epsilon: list[list[int]] = []
+        self.owners: list[int] = []
+
+    def state(self, owner: int) -> int:
+        self.labels.append(None)
+        self.targets.append(-1)
+        self.epsilon.append([])
+        self.owners.append(owner)
+        return len(self.labels) - 1
+
+
+class _RegexCompiler:
+    """
+    Recursive descent parser for the regular expression subset used by
+    the tokenizer spec, building NFA fragments as it goes.
+
+    Alternative
+      : Sequence
+      | Alternative '|' Sequence
+      ;
+
+    Sequence
+      : (Atom Quantifier?)*
+      ;
+
+    `\\b` is accepted at rule boundaries only and compiles to nothing:
+    under the longest-match policy a keyword followed by a word character
+    loses against the longer identifier anyway. Lazy quantifiers turn the
+    whole rule into a shortest-match rule.
+    """
+
+    def __init__(self, nfa: _NFA, rule: int, pattern: str):
+        self._nfa = nfa
+        self._rule = rule
+        self._pattern = pattern
+        self._cursor = 0
+        self.lazy = False
+
+    def compile(self) -> tuple[int, int]:
+        fragment = self.alternative()
+        if self._cursor != len(self._pattern):
+            raise ValueError(f'Unsupported pattern: {self._pattern!r}')
+        return fragment
+
+    def _peek(self) -> str or None:
+        return self._pattern[self._cursor] if self._cursor < len(self._pattern) else None
+
+    def _epsilon(self) -> tuple[int, int]:
+        state = self._nfa.state(self._rule)
+        return state, state
+
+    def alternative(self) -> tuple[int, int]:
+        fragments = [self.sequence()]
+        while self._peek() == '|':
+            self._cursor += 1
+            fragments.append(self.sequence())
+        if len(fragments) == 1:
+            return fragments[0]
+        start, end = self._nfa.state(self._rule), self._nfa.state(self._rule)
+        for first, last in fragments:
+            self._nfa.epsilon[start].append(first)
+            self._nfa.epsilon[last].append(end)
+        return start, end
+
+    def sequence(self) -> tuple[int, int]:
+        start, end = self._epsilon()
+        while self._peek() not in (None, '|', ')'):
+            first, last = self.quantifier(self.atom())
+            self._nfa.epsilon[end].append(first)
+            end = last
+        return start, end
+
+    def quantifier(self, fragment: tuple[int, int]) -> tuple[int, int]:
+        operator = self._peek()
+        if operator not in ('*', '+', '?'):
+            return fragment
+        self._cursor += 1
+        if self._peek() == '?':
+            self._cursor += 1
+            self.lazy = True
+
+        first, last = fragment
+        start, end = self._nfa.state(self._rule), self._nfa.state(self._rule)
+        self._nfa.epsilon[start].append(first)
+        self._nfa.epsilon[last].append(end)
+        if operator in ('*', '?'):
+            self._nfa.epsilon[start].append(end)
+        if operator in ('*', '+'):
+            self._nfa.epsilon[last].append(first)
+        return start, end
+
+    def atom(self) -> tuple[int, int]:
+        begin = self._cursor
+        char = self._pattern[begin]
+        if char == '(':
+            self._cursor += 3 if self._pattern.startswith('(?:', begin) else 1
+            fragment = self.alternative()
+            if self._peek() != ')':
+                raise ValueError(f'Unbalanced group in pattern: {self._pattern!r}')
+            self._cursor += 1
+            return fragment
+        if char == '[':
+            self._cursor += 2 if self._pattern.startswith('[^', begin) else 1
+            # A leading ']' is a literal member of the class.
+            if self._peek() == ']':
+                self._cursor += 1
+            while self._peek() != ']':
+                if self._peek() is None:
+                    raise ValueError(f'Unterminated character class in pattern: {self._pattern!r}')
+                self._cursor += 2 if self._peek() == '\\' else 1
+            self._cursor += 1
+        elif char == '\\':
+            self._cursor += 2
+            if self._pattern[begin + 1] == 'b':
+                return self._epsilon()
+        elif char in '*+?{}^$':
+            raise ValueError(f'Unsupported pattern: {self._pattern!r}')
+        else:
+            self._cursor += 1
+
+        # Whatever the atom is, `re` itself decides which symbols it matches.
+        matcher = re.compile(self._pattern[begin:self._cursor])
+        label = frozenset(symbol for symbol, char in enumerate(_SYMBOLS) if matcher.fullmatch(char))
+        start, end = self._nfa.state(self._rule), self._nfa.state(self._rule)
+        self._nfa.labels[start] = label
+        self._nfa.targets[start] = end
+        return start, end
+
+
+class DFA:
+    """
+    Deterministic automaton recognizing a prioritized list of patterns.
+
+    Transitions are kept in one flat array indexed by
+    `state * width + character class`, -1 marking the dead state.
+    `accepts[state]` is the index of the winning pattern or -1.
+    """
+
+    def __init__(self, classes: bytes, width: int, transitions: array, accepts: array):
+        self.classes: bytes = classes
+        self.width: int = width
+        self.transitions: array = transitions
+        self.accepts: array = accepts
+        self._translation: dict = {code: chr(classes[code]) for code in range(128)}
+
+    @classmethod
+    def compile(cls, patterns: list[str]) -> 'DFA':
+        """
+        Builds the automaton by subset construction. Among the patterns
+        matching the longest prefix, the one listed first wins.
+        """
+        nfa = _NFA()
+        start = nfa.state(-1)
+        finals: dict[int, int] = {}
+        shortest: set[int] = set()
+        for rule, pattern in enumerate(patterns):
+            compiler = _RegexCompiler(nfa, rule, pattern)
+            first, last = compiler.compile()
+            nfa.epsilon[start].append(first)
+            finals[last] = rule
+            if compiler.lazy:
+                shortest.add(rule)
+
+        # Character classes: symbols no label tells apart.
+        labels = {label for label in nfa.labels if label is not None}
+        signatures: dict[tuple, int] = {}
+        symbol_class = [
+            signatures.setdefault(tuple(symbol in label for label in labels), len(signatures))
+            for symbol in range(len(_SYMBOLS))
+        ]
+        width = len(signatures)
+        edges = [
+            frozenset(symbol_class[symbol] for symbol in label) if label is not None else None
+            for label in nfa.labels
+        ]
+
+        def closure(states) -> frozenset:
+            stack = list(states)
+            seen = set(stack)
+            while stack:
+                for target in nfa.epsilon[stack.pop()]:
+                    if target not in seen:
+                        seen.add(target)
+                        stack.append(target)
+            # A shortest-match rule stops growing once it has matched.
+            for final, rule in finals.items():
+                if rule in shortest and final in seen:
+                    seen = {state for state in seen if nfa.owners[state] != rule or state == final}
+            return frozenset(seen)
+
+        initial = closure([start])
+        numbering = {initial: 0}
+        pending = [initial]
+        transitions = array('i')
+        accepts = array('i')
+        while pending:
+            current = pending.pop(0)
+            matched = [finals[state] for state in current if state in finals]
+            accepts.append(min(matched) if matched else -1)
+            for char_class in range(width):
+                targets = [nfa.targets[state] for state in current
+                           if edges[state] is not None and char_class in edges[state]]
+                if not targets:
+                    transitions.append(-1)
+                    continue
+                following = closure(targets)
+                if following not in numbering:
+                    numbering[following] = len(numbering)
+                    pending.append(following)
+                transitions.append(numbering[following])
+
+        return cls(bytes(symbol_class), width, transitions, accepts)
+
+    def translate(self, string: str) -> bytes:
+        """
+        Maps every character of the input to its character class.
+        """
+        return string.translate(_ClassTable(self)).encode('latin-1')
+
+
+class _ClassTable(dict):
+    """
+    Translation table for `str.translate`, filled lazily for non-ASCII
+    code points.
+    """
+
+    def __init__(self, dfa: DFA):
+        super().__init__(dfa._translation)
+        self._classes = dfa.classes
+
+    def __missing__(self, code: int) -> str:
+        value = chr(self._classes[_category(chr(code))])
+        self[code] = value
+        return value
+
+
+class Scanner:
+    """
+    Runs a DFA over one input string.
+
+    Longest-match scanning alone goes quadratic on inputs like a run of
+    unterminated comment openers, since each attempt reads to the end of
+    the input before backing off. The scanner remembers, for each
+    position, a state that was left there without reaching an accepting
+    state and stops as soon as it meets that pair again. The failed
+    attempts of such a run pass through the same states, so each position
+    is walked past a bounded number of times and a full tokenization
+    stays linear. The memo is one array entry per input position,
+    allocated on the first failed attempt.
+    """
+
+    def __init__(self, dfa: DFA, string: str):
+        self._dfa = dfa
+        self._classes: bytes = dfa.translate(string)
+        # Failed state + 1 by position, 0 for none.
+        self._typecode: str = 'B' if len(dfa.accepts) < 255 else 'I'
+        self._failed: array or None = None
+        self._unproductive: array = array(self._typecode)
+
+    def match(self, cursor: int) -> tuple[int, int]:
+        """
+        Returns the winning pattern index and the end of the longest match
+        at the cursor, or (-1, cursor) if no pattern matches.
+        """
+        classes = self._classes
+        transitions = self._dfa.transitions
+        accepts = self._dfa.accepts
+        width = self._dfa.width
+        failed = self._failed
+
+        rule, end = -1, cursor
+        # States passed since the last accepting one, from position `first`.
+        unproductive = self._unproductive
+        add = unproductive.append
+        first = cursor + 1
+        state = 0
+        position = cursor
+        length = len(classes)
+        while position < length:
+            state = transitions[state * width + classes[position]]
+            if state < 0:
+                break
+            position += 1
+            if failed is not None and failed[position] == state + 1:
+                break
+            accepted = accepts[state]
+            if accepted >= 0:
+                rule, end = accepted, position
+                del unproductive[:]
+                first = position + 1
+            else:
+                add(state + 1)
+        if unproductive:
+            if failed is None:
+                failed = self._failed = array(self._typecode, bytes(unproductive.itemsize * (length + 1)))
+            failed[first:first + len(unproductive)] = unproductive
+            del unproductive[:]
+        return rule, end
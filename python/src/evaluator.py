@@ -0,0 +1,596 @@
+import operator
+from typing import Any, Callable
+from src.numeric import integer
+
+Closure = Callable[[list], Any]
+
+_FRAME_HEADER = 3  # parent, this, function
+
+
+class Function:
+    """
+    Compiled function closed over the frame it was declared in.
+    """
+
+    __slots__ = ('name', 'arity', 'locals', 'body', 'parent', 'home')
+
+    def __init__(self, name: str, arity: int, size: int, body: Closure, parent: list, home=None):
+        self.name: str = name
+        self.arity: int = arity
+        # Initial values of the frame slots after the parameters.
+        self.locals: list = [None] * (size - _FRAME_HEADER - arity)
+        self.body: Closure = body
+        self.parent: list = parent
+        # Class the function is a method of, for `super`.
+        self.home: Class or None = home
+
+    def __repr__(self) -> str:
+        return f'<function {self.name}>'
+
+
+class Class:
+    """
+    Class with its own methods, falling back to the superclass.
+    """
+
+    def __init__(self, name: str, superclass: 'Class' or None, methods: dict[str, Function]):
+        self.name: str = name
+        self.superclass: Class or None = superclass
+        self.methods: dict[str, Function] = methods
+
+    def lookup(self, name: str) -> Function or None:
+        cls = self
+        while cls is not None:
+            method = cls.methods.get(name)
+            if method is not None:
+                return method
+            cls = cls.superclass
+        return None
+
+    def __repr__(self) -> str:
+        return f'<class {self.name}>'
+
+
+class Instance:
+    __slots__ = ('cls', 'fields')
+
+    def __init__(self, cls: Class):
+        self.cls: Class = cls
+        self.fields: dict[str, Any] = {}
+
+    def __repr__(self) -> str:
+        return f'<{self.cls.name} {self.fields!r}>'
+
+
+class BoundMethod:
+    __slots__ = ('this', 'function')
+
+    def __init__(self, this: Instance, function: Function):
+        self.this: Instance = this
+        self.function: Function = function
+
+
+def call(function, this, args: list):
+    """
+    Calls a compiled function, a bound method or a Python callable.
+    """
+    if type(function) is Function:
+        if len(args) != function.arity:
+            args = (args + [None] * function.arity)[:function.arity]
+        frame = [function.parent, this, function, *args, *function.locals]
+        result = function.body(frame)
+        return result[0] if result is not None else None
+    if type(function) is BoundMethod:
+        return call(function.function, function.this, args)
+    if type(function) is Class:
+        raise TypeError(f'Class {function.name} cannot be invoked without new')
+    if callable(function):
+        return function(*args)
+    raise TypeError(f'{function!r} is not a function')
+
+
+def get_member(value, key):
+    if type(value) is Instance:
+        fields = value.fields
+        if key in fields:
+            return fields[key]
+        method = value.cls.lookup(key)
+        if method is not None:
+            return BoundMethod(value, method)
+        return None
+    if key == 'length' and isinstance(value, (str, list)):
+        return len(value)
+    if isinstance(value, (str, list, dict)):
+        return value[key]
+    raise TypeError(f'Cannot read property {key!r} of {value!r}')
+
+
+def set_member(value, key, item):
+    if type(value) is Instance:
+        value.fields[key] = item
+    elif isinstance(value, (list, dict)):
+        value[key] = item
+    else:
+        raise TypeError(f'Cannot set property {key!r} of {value!r}')
+    return item
+
+
+def construct(cls, args: list):
+    if type(cls) is not Class:
+        raise TypeError(f'{cls!r} is not a constructor')
+    instance = Instance(cls)
+    constructor = cls.lookup('constructor')
+    if constructor is not None:
+        call(constructor, instance, args)
+    return instance
+
+
+_binary: dict[str, Callable[[Closure, Closure], Closure]] = {
+    '+': lambda left, right: lambda frame: left(frame) + right(frame),
+    '-': lambda left, right: lambda frame: left(frame) - right(frame),
+    '*': lambda left, right: lambda frame: left(frame) * right(frame),
+    '/': lambda left, right: lambda frame: left(frame) / right(frame),
+    '<': lambda left, right: lambda frame: left(frame) < right(frame),
+    '<=': lambda left, right: lambda frame: left(frame) <= right(frame),
+    '>': lambda left, right: lambda frame: left(frame) > right(frame),
+    '>=': lambda left, right: lambda frame: left(frame) >= right(frame),
+    '==': lambda left, right: lambda frame: left(frame) == right(frame),
+    '!=': lambda left, right: lambda frame: left(frame) != right(frame),
+}
+
+_compound: dict[str, Callable[[Any, Any], Any]] = {
+    '+=': operator.add,
+    '-=': operator.sub,
+    '*=': operator.mul,
+    '/=': operator.truediv,
+}
+
+
+class _Scope:
+    """
+    Compile-time scope: names declared in one block or function body.
+    Slots are numbered per function, since that is what gets a frame.
+    """
+
+    def __init__(self, parent: '_Scope' or None, function: bool):
+        self.parent: _Scope or None = parent
+        self.names: dict[str, int] = {}
+        self.function: _Scope = self if function or parent is None else parent.function
+        self.size: int = _FRAME_HEADER
+
+    def declare(self, name: str) -> int:
+        slot = self.names.get(name)
+        if slot is None:
+            slot = self.names[name] = self.function.size
+            self.function.size += 1
+        return slot
+
+    def resolve(self, name: str) -> tuple[int, int] or None:
+        """
+        Frame depth and slot of a name, None if it is a global.
+        """
+        depth = 0
+        scope = self
+        while scope is not None:
+            slot = scope.names.get(name)
+            if slot is not None:
+                return depth, slot
+            if scope.function is scope:
+                depth += 1
+            scope = scope.parent
+        return None
+
+
+def _read(depth: int, slot: int) -> Closure:
+    if depth == 0:
+        return lambda frame: frame[slot]
+    if depth == 1:
+        return lambda frame: frame[0][slot]
+
+    def read(frame):
+        for _ in range(depth):
+            frame = frame[0]
+        return frame[slot]
+    return read
+
+
+def _frame_at(depth: int) -> Closure:
+    if depth == 0:
+        return lambda frame: frame
+    if depth == 1:
+        return lambda frame: frame[0]
+
+    def find(frame):
+        for _ in range(depth):
+            frame = frame[0]
+        return frame
+    return find
+
+
+class Compiler:
+    """
+    Compiles an AST into closures, one compile method per node type.
+
+    Every node is compiled once into a Python closure taking the current
+    frame, so running a program never looks at `node['type']` again. Names
+    are resolved at compile time: a frame is a list
+
+        [parent frame, this, function, parameters..., locals...]
+
+    and each variable read or write becomes an index into the frame, or into
+    an enclosing frame a known number of levels up. Block scoped names get
+    slots of their own in the frame of the enclosing function. Names not
+    declared anywhere are looked up in the globals at run time.
+
+    Values are plain Python values and operators follow Python semantics,
+    except `&&`, `||` and `!`, which short-circuit on truthiness like the
+    language they come from. Statements return None, or a 1-tuple holding
+    the value of a `return` that is unwinding.
+    """
+
+    def __init__(self, globals: dict or None = None):
+        self.globals: dict = {'print': print} if globals is None else globals
+        self._scope: _Scope or None = None
+
+    def compile(self, node) -> Closure:
+        return getattr(self, node['type'])(node)
+
+    def program(self, ast) -> Callable[[], dict]:
+        """
+        Compiles a Program; calling the result runs it and returns its
+        top-level bindings.
+        """
+        self._scope = scope = _Scope(None, True)
+        body = self._statements(ast['body'])
+        size = scope.size
+
+        def run() -> dict:
+            frame = [None, None, None] + [None] * (size - _FRAME_HEADER)
+            body(frame)
+            return {name: frame[slot] for name, slot in scope.names.items()}
+        return run
+
+    # Statements
+
+    def _declare_block(self, statements):
+        """
+        Declares the names a block introduces before compiling it, so
+        that functions can refer to anything in scope.
+        """
+        for statement in statements:
+            match statement['type']:
+                case 'VariableStatement':
+                    for declaration in statement['declarations']:
+                        self._scope.declare(declaration['id']['name'])
+                case 'FunctionDeclaration':
+                    self._scope.declare(statement['name']['name'])
+                case 'ClassDeclaration':
+                    self._scope.declare(statement['id']['name'])
+
+    def _statements(self, statements) -> Closure:
+        self._declare_block(statements)
+        # Function declarations are initialized on entry to their block.
+        hoisted = [self.compile(statement) for statement in statements
+                   if statement['type'] == 'FunctionDeclaration']
+        compiled = hoisted + [self.compile(statement) for statement in statements
+                              if statement['type'] not in ('FunctionDeclaration', 'EmptyStatement')]
+
+        if len(compiled) == 1:
+            return compiled[0]
+
+        def block(frame):
+            for statement in compiled:
+                result = statement(frame)
+                if result is not None:
+                    return result
+        return block
+
+    def BlockStatement(self, node) -> Closure:
+        self._scope = _Scope(self._scope, False)
+        try:
+            return self._statements(node['body'])
+        finally:
+            self._scope = self._scope.parent
+
+    def EmptyStatement(self, node) -> Closure:
+        return lambda frame: None
+
+    def ExpressionStatement(self, node) -> Closure:
+        expression = self.compile(node['expression'])
+
+        def statement(frame):
+            expression(frame)
+        return statement
+
+    def VariableStatement(self, node) -> Closure:
+        assignments = []
+        for declaration in node['declarations']:
+            slot = self._scope.declare(declaration['id']['name'])
+            init = self.compile(declaration['init']) if declaration['init'] is not None else lambda frame: None
+            assignments.append((slot, init))
+
+        if len(assignments) == 1:
+            [(slot, init)] = assignments
+
+            def single(frame):
+                frame[slot] = init(frame)
+            return single
+
+        def statement(frame):
+            for slot, init in assignments:
+                frame[slot] = init(frame)
+        return statement
+
+    def IfStatement(self, node) -> Closure:
+        test = self.compile(node['test'])
+        consequent = self.compile(node['consequent'])
+        alternate = self.compile(node['alternate']) if node['alternate'] is not None else lambda frame: None
+
+        def statement(frame):
+            if test(frame):
+                return consequent(frame)
+            return alternate(frame)
+        return statement
+
+    def WhileStatement(self, node) -> Closure:
+        test = self.compile(node['test'])
+        body = self.compile(node['body'])
+
+        def statement(frame):
+            while test(frame):
+                result = body(frame)
+                if result is not None:
+                    return result
+        return statement
+
+    def DoWhileStatement(self, node) -> Closure:
+        test = self.compile(node['test'])
+        body = self.compile(node['body'])
+
+        def statement(frame):
+            while True:
+                result = body(frame)
+                if result is not None:
+                    return result
+                if not test(frame):
+                    return None
+        return statement
+
+    def ForStatement(self, node) -> Closure:
+        self._scope = _Scope(self._scope, False)
+        try:
+            init = self.compile(node['init']) if node['init'] is not None else lambda frame: None
+            test = self.compile(node['test']) if node['test'] is not None else lambda frame: True
+            update = self.compile(node['update']) if node['update'] is not None else lambda frame: None
+            body = self.compile(node['body'])
+        finally:
+            self._scope = self._scope.parent
+
+        def statement(frame):
+            init(frame)
+            while test(frame):
+                result = body(frame)
+                if result is not None:
+                    return result
+                update(frame)
+        return statement
+
+    def ReturnStatement(self, node) -> Closure:
+        if node['argument'] is None:
+            return lambda frame: (None,)
+        argument = self.compile(node['argument'])
+        return lambda frame: (argument(frame),)
+
+    def FunctionDeclaration(self, node) -> Closure:
+        name = node['name']['name']
+        slot = self._scope.declare(name)
+        function = self._function(node)
+
+        def statement(frame):
+            frame[slot] = function(frame, None)
+        return statement
+
+    def _function(self, node) -> Callable[[list, Class or None], Function]:
+        """
+        Compiles a function body; the result instantiates the function
+        in a frame.
+        """
+        outer = self._scope
+        self._scope = scope = _Scope(outer, True)
+        try:
+            params = [param['name'] for param in node['params']]
+            for param in params:
+                scope.declare(param)
+            body = self.compile(node['body'])
+        finally:
+            self._scope = outer
+
+        name = node['name']['name']
+        arity = len(params)
+        size = scope.size
+        return lambda frame, home: Function(name, arity, size, body, frame, home)
+
+    def ClassDeclaration(self, node) -> Closure:
+        name = node['id']['name']
+        slot = self._scope.declare(name)
+        superclass = self.compile(node['superClass']) if node['superClass'] is not None else lambda frame: None
+        methods = []
+        for member in node['body']['body']:
+            if member['type'] != 'FunctionDeclaration':
+                raise SyntaxError(f'Unexpected {member["type"]} in body of class {name}')
+            methods.append((member['name']['name'], self._function(member)))
+
+        def statement(frame):
+            cls = Class(name, superclass(frame), {})
+            for method_name, method in methods:
+                cls.methods[method_name] = method(frame, cls)
+            frame[slot] = cls
+        return statement
+
+    # Expressions
+
+    def NumericLiteral(self, node) -> Closure:
+        value = integer(node['value'])
+        return lambda frame: value
+
+    def StringLiteral(self, node) -> Closure:
+        value = node['value']
+        return lambda frame: value
+
+    BooleanLiteral = NullLiteral = StringLiteral
+
+    def Identifier(self, node) -> Closure:
+        name = node['name']
+        resolved = self._scope.resolve(name)
+        if resolved is not None:
+            return _read(*resolved)
+        globals = self.globals
+
+        def read(frame):
+            try:
+                return globals[name]
+            except KeyError:
+                raise NameError(f'{name} is not defined') from None
+        return read
+
+    def ThisExpression(self, node) -> Closure:
+        return lambda frame: frame[1]
+
+    def BinaryExpression(self, node) -> Closure:
+        return _binary[node['operator']](self.compile(node['left']), self.compile(node['right']))
+
+    def LogicalExpression(self, node) -> Closure:
+        left = self.compile(node['left'])
+        right = self.compile(node['right'])
+        if node['operator'] == '&&':
+            return lambda frame: left(frame) and right(frame)
+        return lambda frame: left(frame) or right(frame)
+
+    def UnaryExpression(self, node) -> Closure:
+        argument = self.compile(node['argument'])
+        match node['operator']:
+            case '-':
+                return lambda frame: -argument(frame)
+            case '+':
+                return lambda frame: +argument(frame)
+            case _:
+                return lambda frame: not argument(frame)
+
+    def AssignmentExpression(self, node) -> Closure:
+        target = node['left']
+        right = self.compile(node['right'])
+        compound = _compound.get(node['operator'])
+
+        if target['type'] == 'MemberExpression':
+            target_object = self.compile(target['object'])
+            key = self._member_key(target)
+            if compound is None:
+                return lambda frame: set_member(target_object(frame), key(frame), right(frame))
+
+            def assign_member(frame):
+                value = target_object(frame)
+                name = key(frame)
+                return set_member(value, name, compound(get_member(value, name), right(frame)))
+            return assign_member
+
+        name = target['name']
+        resolved = self._scope.resolve(name)
+        if resolved is None:
+            globals = self.globals
+            if compound is None:
+                def assign_global(frame):
+                    value = globals[name] = right(frame)
+                    return value
+                return assign_global
+
+            def update_global(frame):
+                value = globals[name] = compound(globals[name], right(frame))
+                return value
+            return update_global
+
+        depth, slot = resolved
+        if depth == 0:
+            if compound is None:
+                def assign(frame):
+                    value = frame[slot] = right(frame)
+                    return value
+                return assign
+
+            def update(frame):
+                value = frame[slot] = compound(frame[slot], right(frame))
+                return value
+            return update
+
+        find = _frame_at(depth)
+
+        def assign_outer(frame):
+            outer = find(frame)
+            value = outer[slot] = right(frame) if compound is None else compound(outer[slot], right(frame))
+            return value
+        return assign_outer
+
+    def _member_key(self, node) -> Closure:
+        if node['computed']:
+            return self.compile(node['property'])
+        name = node['property']['name']
+        return lambda frame: name
+
+    def MemberExpression(self, node) -> Closure:
+        value = self.compile(node['object'])
+        if node['computed']:
+            key = self.compile(node['property'])
+            return lambda frame: get_member(value(frame), key(frame))
+        name = node['property']['name']
+        return lambda frame: get_member(value(frame), name)
+
+    def CallExpression(self, node) -> Closure:
+        callee = node['callee']
+        arguments = [self.compile(argument) for argument in node['arguments']]
+
+        if callee['type'] == 'Super':
+            def call_super(frame):
+                home = frame[2].home if frame[2] is not None else None
+                parent = home.superclass if home is not None else None
+                constructor = parent.lookup('constructor') if parent is not None else None
+                if constructor is None:
+                    raise TypeError('No superclass constructor to call')
+                return call(constructor, frame[1], [argument(frame) for argument in arguments])
+            return call_super
+
+        if callee['type'] == 'MemberExpression':
+            # Method calls pass `this` without building a bound method.
+            target = self.compile(callee['object'])
+            key = self._member_key(callee)
+
+            def call_method(frame):
+                this = target(frame)
+                name = key(frame)
+                if type(this) is Instance and name not in this.fields:
+                    method = this.cls.lookup(name)
+                    if method is not None:
+                        return call(method, this, [argument(frame) for argument in arguments])
+                return call(get_member(this, name), None, [argument(frame) for argument in arguments])
+            return call_method
+
+        function = self.compile(callee)
+        return lambda frame: call(function(frame), None, [argument(frame) for argument in arguments])
+
+    def NewExpression(self, node) -> Closure:
+        callee = self.compile(node['callee'])
+        arguments = [self.compile(argument) for argument in node['arguments']]
+        return lambda frame: construct(callee(frame), [argument(frame) for argument in arguments])
+
+
+def compile_program(ast, globals: dict or None = None) -> Callable[[], dict]:
+    """
+    Compiles a Program node; calling the result runs the program and
+    returns its top-level bindings.
+    """
+    return Compiler(globals).program(ast)
+
+
+def evaluate(ast, globals: dict or None = None) -> dict:
+    """
+    Compiles and runs a Program node, returning its top-level bindings.
+    """
+    return compile_program(ast, globals)()
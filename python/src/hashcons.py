@@ -0,0 +1,107 @@
+from collections.abc import Mapping
+
+
+class Node(Mapping):
+    """
+    Immutable AST node, read like the dict the parser builds otherwise.
+
+    Nodes come out of a `NodeTable`, which hands out the same node for
+    structurally identical subtrees: list fields become tuples and two
+    nodes from one table are equal exactly when they are the same
+    object. `hash` is structural, so it also agrees across tables, and
+    `id` numbers the nodes of a table in creation order.
+    """
+
+    __slots__ = ('_shape', '_values', 'hash', 'id')
+
+    def __init__(self, shape: dict[str, int], values: tuple, structural_hash: int, node_id: int):
+        # Nodes with the same keys share one key -> position mapping.
+        self._shape: dict[str, int] = shape
+        self._values: tuple = values
+        self.hash: int = structural_hash
+        self.id: int = node_id
+
+    def __getitem__(self, key):
+        return self._values[self._shape[key]]
+
+    def __iter__(self):
+        return iter(self._shape)
+
+    def __len__(self) -> int:
+        return len(self._shape)
+
+    def __hash__(self) -> int:
+        return self.hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, Node):
+            return self.hash == other.hash and self._shape == other._shape and self._values == other._values
+        if isinstance(other, Mapping):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'Node({dict(zip(self._shape, self._values))!r})'
+
+    def to_dict(self) -> dict:
+        """
+        The node as the plain dict tree the parser builds by default, with
+        no subtree shared.
+        """
+        return {key: _export(value) for key, value in zip(self._shape, self._values)}
+
+
+def _export(value):
+    if isinstance(value, Node):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_export(item) for item in value]
+    return value
+
+
+class NodeTable:
+    """
+    Hash-consing table: builds each distinct subtree once.
+    """
+
+    def __init__(self):
+        self._nodes: dict[tuple, Node] = {}
+        self._shapes: dict[tuple, dict[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def make(self, node: dict) -> Node:
+        """
+        Returns the shared node for a freshly built dict node whose
+        children already came from this table.
+        """
+        values = []
+        identity = []
+        structure = []
+        for key, value in node.items():
+            if isinstance(value, list):
+                value = tuple(value)
+                identity.append((key, tuple(item.id for item in value)))
+                structure.append((key, tuple(item.hash for item in value)))
+            elif isinstance(value, Node):
+                identity.append((key, value.id))
+                structure.append((key, value.hash))
+            else:
+                # Keep True apart from 1.
+                identity.append((key, type(value), value))
+                structure.append((key, type(value).__name__, value))
+            values.append(value)
+
+        identity = tuple(identity)
+        shared = self._nodes.get(identity)
+        if shared is None:
+            keys = tuple(node)
+            shape = self._shapes.get(keys)
+            if shape is None:
+                shape = self._shapes[keys] = {key: index for index, key in enumerate(keys)}
+            shared = Node(shape, tuple(values), hash(tuple(structure)), len(self._nodes))
+            self._nodes[identity] = shared
+        return shared
@@ -0,0 +1,254 @@
+import mmap
+import struct
+from collections.abc import Mapping
+from src.visitor import Visitor
+
+CALL = 'call'
+NEW = 'new'
+EXTENDS = 'extends'
+CLASS = 'class'
+FUNCTION = 'function'
+ASSIGN = 'assign'
+
+kinds = (CALL, NEW, EXTENDS, CLASS, FUNCTION, ASSIGN)
+
+# magic, version, documents, keys, postings, then the offsets of the
+# document directory, key directory, postings and string sections.
+_HEADER = struct.Struct('<8sIIIIIIII')
+_MAGIC = b'ASTINDEX'
+_VERSION = 2
+# string offset, string length
+_DOCUMENT = struct.Struct('<II')
+# key offset, key length, first posting, posting count
+_KEY = struct.Struct('<IIII')
+# document number, occurrences
+_POSTING = struct.Struct('<II')
+
+
+def _key(kind: str, name: str) -> bytes:
+    return f'{kind}\0{name}'.encode()
+
+
+def _name(node: Mapping) -> str or None:
+    """
+    The name a callee or assignment target goes by: an identifier, or the
+    property of a non-computed member expression (`this.foo` -> 'foo').
+    """
+    match node['type']:
+        case 'Identifier':
+            return node['name']
+        case 'MemberExpression' if not node['computed']:
+            return node['property']['name']
+        case 'Super':
+            return 'super'
+    return None
+
+
+def _target(node: Mapping) -> str or None:
+    """
+    The name an assignment target goes by: as `_name`, except that a
+    property of `this` keeps the qualifier (`this.foo` -> 'this.foo'), so
+    that fields of the class at hand are told apart from those of other
+    objects.
+    """
+    name = _name(node)
+    if name is not None and node['type'] == 'MemberExpression' and node['object']['type'] == 'ThisExpression':
+        return f'this.{name}'
+    return name
+
+
+class _Collector(Visitor):
+
+    def __init__(self):
+        self.occurrences: dict[bytes, int] = {}
+
+    def _add(self, kind: str, name: str or None):
+        if name is not None:
+            key = _key(kind, name)
+            self.occurrences[key] = self.occurrences.get(key, 0) + 1
+
+    def visit_CallExpression(self, node):
+        self._add(CALL, _name(node['callee']))
+
+    def visit_NewExpression(self, node):
+        self._add(NEW, _name(node['callee']))
+
+    def visit_ClassDeclaration(self, node):
+        self._add(CLASS, node['id']['name'])
+        if node['superClass'] is not None:
+            self._add(EXTENDS, _name(node['superClass']))
+
+    def visit_FunctionDeclaration(self, node):
+        self._add(FUNCTION, node['name']['name'])
+
+    def visit_AssignmentExpression(self, node):
+        self._add(ASSIGN, _target(node['left']))
+
+
+class IndexBuilder:
+    """
+    Collects inverted indexes over parsed documents and writes them out
+    for `Index`.
+
+    For each kind, a name maps to the documents it occurs in and how
+    often:
+      call:     callee of a CallExpression (`f()`, `this.f()` -> 'f')
+      new:      callee of a NewExpression
+      extends:  superClass of a ClassDeclaration
+      class:    name of a ClassDeclaration
+      function: name of a FunctionDeclaration, methods included
+      assign:   target of an AssignmentExpression (`c.foo = 1` -> 'foo',
+                `this.foo = 1` -> 'this.foo')
+    """
+
+    def __init__(self):
+        self.documents: list[str] = []
+        self._postings: dict[bytes, list[tuple[int, int]]] = {}
+
+    def add(self, document: str, ast: Mapping):
+        """
+        Indexes the AST of one document, such as a file name.
+        """
+        number = len(self.documents)
+        self.documents.append(document)
+        collector = _Collector()
+        collector.walk(ast)
+        for key, count in collector.occurrences.items():
+            self._postings.setdefault(key, []).append((number, count))
+
+    def write(self, path: str):
+        strings = bytearray()
+        documents = bytearray()
+        for document in self.documents:
+            encoded = document.encode()
+            documents += _DOCUMENT.pack(len(strings), len(encoded))
+            strings += encoded
+
+        keys = bytearray()
+        postings = bytearray()
+        posting_count = 0
+        for key in sorted(self._postings):
+            entries = self._postings[key]
+            keys += _KEY.pack(len(strings), len(key), posting_count, len(entries))
+            strings += key
+            for entry in entries:
+                postings += _POSTING.pack(*entry)
+            posting_count += len(entries)
+
+        documents_offset = _HEADER.size
+        keys_offset = documents_offset + len(documents)
+        postings_offset = keys_offset + len(keys)
+        strings_offset = postings_offset + len(postings)
+        with open(path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, len(self.documents), len(self._postings), posting_count,
+                                    documents_offset, keys_offset, postings_offset, strings_offset))
+            file.write(documents)
+            file.write(keys)
+            file.write(postings)
+            file.write(strings)
+
+
+class Index:
+    """
+    Read-only view of an index file written by `IndexBuilder`.
+
+    The file is memory-mapped and nothing is read up front: a lookup is a
+    binary search over the sorted key directory followed by reading the
+    postings, so it touches a few pages however large the index is.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(f'{path}: not an index file of version {_VERSION}')
+        (magic, version, self._document_count, self._key_count, _, self._documents, self._keys,
+         self._postings, self._strings) = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f'{path}: not an index file of version {_VERSION}')
+
+    def __enter__(self) -> 'Index':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._map.close()
+
+    def __len__(self) -> int:
+        """
+        Number of documents.
+        """
+        return self._document_count
+
+    def document(self, number: int) -> str:
+        offset, length = _DOCUMENT.unpack_from(self._map, self._documents + number * _DOCUMENT.size)
+        return self._string(offset, length).decode()
+
+    def lookup(self, kind: str, name: str) -> list[tuple[str, int]]:
+        """
+        Documents in which `name` occurs as `kind`, with the number of
+        occurrences, in the order they were indexed.
+        """
+        key = _key(kind, name)
+        position = self._lower_bound(key)
+        if position == self._key_count or self._key_at(position) != key:
+            return []
+        _, _, first, count = _KEY.unpack_from(self._map, self._keys + position * _KEY.size)
+        postings = []
+        for index in range(first, first + count):
+            number, occurrences = _POSTING.unpack_from(self._map, self._postings + index * _POSTING.size)
+            postings.append((self.document(number), occurrences))
+        return postings
+
+    def names(self, kind: str) -> list[str]:
+        """
+        All names indexed as `kind`, sorted.
+        """
+        prefix = _key(kind, '')
+        names = []
+        for position in range(self._lower_bound(prefix), self._key_count):
+            key = self._key_at(position)
+            if not key.startswith(prefix):
+                break
+            names.append(key[len(prefix):].decode())
+        return names
+
+    def calls(self, name: str) -> list[tuple[str, int]]:
+        return self.lookup(CALL, name)
+
+    def instantiations(self, name: str) -> list[tuple[str, int]]:
+        return self.lookup(NEW, name)
+
+    def subclasses(self, name: str) -> list[tuple[str, int]]:
+        return self.lookup(EXTENDS, name)
+
+    def classes(self, name: str) -> list[tuple[str, int]]:
+        return self.lookup(CLASS, name)
+
+    def functions(self, name: str) -> list[tuple[str, int]]:
+        return self.lookup(FUNCTION, name)
+
+    def assignments(self, name: str) -> list[tuple[str, int]]:
+        return self.lookup(ASSIGN, name)
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self._strings + offset
+        return self._map[start:start + length]
+
+    def _key_at(self, position: int) -> bytes:
+        offset, length, _, _ = _KEY.unpack_from(self._map, self._keys + position * _KEY.size)
+        return self._string(offset, length)
+
+    def _lower_bound(self, key: bytes) -> int:
+        low, high = 0, self._key_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
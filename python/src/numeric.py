@@ -0,0 +1,93 @@
+import sys
+from functools import lru_cache
+
+# Digits converted by one int() call: well under sys.int_max_str_digits,
+# and short enough that int()'s quadratic time does not show.
+_CHUNK = 1000
+
+# hash() of a non-negative int is its value modulo this.
+_MODULUS = sys.hash_info.modulus
+# Digits folded into a hash at a time, kept to small ints.
+_HASH_CHUNK = 18
+
+
+@lru_cache(maxsize=None)
+def _power(exponent: int) -> int:
+    return 10 ** exponent
+
+
+def to_int(digits: str) -> int:
+    """
+    Value of a string of decimal digits of any length. Long strings are
+    split in halves that are converted separately and recombined, so no
+    int() call sees more than `_CHUNK` digits and the conversion is
+    subquadratic.
+    """
+    if len(digits) <= _CHUNK:
+        return int(digits)
+    low = len(digits) // 2
+    return to_int(digits[:-low]) * _power(low) + to_int(digits[-low:])
+
+
+class NumericValue:
+    """
+    Value of a NumericLiteral kept as the digits it was written with and
+    converted to an int on first use.
+
+    It compares and hashes like its int, and `int()` or `integer()` give
+    the int itself.
+    """
+
+    __slots__ = ('raw', '_value')
+
+    def __init__(self, raw: str):
+        self.raw: str = raw
+        self._value: int or None = None
+
+    @property
+    def value(self) -> int:
+        if self._value is None:
+            self._value = to_int(self.raw)
+        return self._value
+
+    def __int__(self) -> int:
+        return self.value
+
+    __index__ = __int__
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, NumericValue):
+            return self.raw == other.raw or self.value == other.value
+        if isinstance(other, int):
+            return self.value == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # The int's hash, folded from the digits so that hashing (as
+        # hash-consing does for every literal) converts nothing.
+        raw = self.raw
+        if len(raw) <= _HASH_CHUNK:
+            return hash(int(raw))
+        digest = 0
+        for start in range(0, len(raw), _HASH_CHUNK):
+            chunk = raw[start:start + _HASH_CHUNK]
+            digest = (digest * _power(len(chunk)) + int(chunk)) % _MODULUS
+        return hash(digest)
+
+    def __str__(self) -> str:
+        return self.raw
+
+    def __repr__(self) -> str:
+        return f'NumericValue({self.raw!r})'
+
+
+def integer(value: int or NumericValue or str) -> int:
+    """
+    The int a NumericLiteral value stands for, whichever of the parser's
+    `numbers` modes built it.
+    """
+    if isinstance(value, int):
+        return value
+    if isinstance(value, NumericValue):
+        return value.value
+    return to_int(value)
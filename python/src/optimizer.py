@@ -0,0 +1,144 @@
+from src.numeric import integer
+from src.visitor import Transformer
+
+_SPAN_KEYS = ('start', 'end', 'loc', 'range')
+
+_arithmetic = {
+    '+': lambda left, right: left + right,
+    '-': lambda left, right: left - right,
+    '*': lambda left, right: left * right,
+}
+
+_comparison = {
+    '<': lambda left, right: left < right,
+    '<=': lambda left, right: left <= right,
+    '>': lambda left, right: left > right,
+    '>=': lambda left, right: left >= right,
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+}
+
+_declarations = ('VariableStatement', 'FunctionDeclaration', 'ClassDeclaration')
+
+
+def fold(node):
+    """
+    Constant folding pass over a parsed AST.
+
+    Collapses arithmetic and comparisons on literals, `&&`, `||` and `!`
+    with a literal operand, and IfStatements with a literal test. Only
+    what evaluates the same at run time is folded: operands must be of
+    one literal kind, and `/` (which may raise or leave the integers) and
+    mixed-type `+` are left alone. A negative result stays a unary minus
+    on a NumericLiteral, the way the parser writes it, and a dead branch
+    that is itself a declaration is kept. A replacement carries the span
+    keys ('start', 'end', 'loc', 'range') of the node it replaces.
+
+    Returns the folded tree; nodes are copied where something changed
+    and shared with the input otherwise. Hash-consed nodes that change
+    come back as plain dicts.
+    """
+    return _Folder().transform(node)
+
+
+def _replace(node, replacement):
+    spans = {key: node[key] for key in _SPAN_KEYS if key in node}
+    if not spans:
+        return replacement
+    replacement = dict(replacement)
+    replacement.update(spans)
+    return replacement
+
+
+def _constant(node) -> tuple[str, object] or None:
+    """
+    Literal kind and value of a constant operand.
+    """
+    match node['type']:
+        case 'NumericLiteral':
+            return 'number', integer(node['value'])
+        case 'StringLiteral':
+            return 'string', node['value']
+        case 'BooleanLiteral':
+            return 'boolean', node['value']
+        case 'NullLiteral':
+            return 'null', None
+        case 'UnaryExpression' if node['operator'] == '-' and node['argument']['type'] == 'NumericLiteral':
+            return 'number', -integer(node['argument']['value'])
+    return None
+
+
+def _literal(value) -> dict:
+    if value is None:
+        return {'type': 'NullLiteral', 'value': None}
+    if isinstance(value, bool):
+        return {'type': 'BooleanLiteral', 'value': value}
+    if isinstance(value, str):
+        return {'type': 'StringLiteral', 'value': value}
+    if value < 0:
+        return {'type': 'UnaryExpression', 'operator': '-', 'argument': _literal(-value)}
+    return {'type': 'NumericLiteral', 'value': value}
+
+
+def _binary_expression(node):
+    left = _constant(node['left'])
+    right = _constant(node['right'])
+    if left is None or right is None or left[0] != right[0]:
+        return node
+    kind = left[0]
+    operator = node['operator']
+    if operator in _comparison:
+        if operator in ('==', '!=') or kind in ('number', 'string'):
+            return _literal(_comparison[operator](left[1], right[1]))
+    elif operator == '+' and kind in ('number', 'string') or operator in _arithmetic and kind == 'number':
+        return _literal(_arithmetic[operator](left[1], right[1]))
+    return node
+
+
+def _logical_expression(node):
+    left = _constant(node['left'])
+    if left is None:
+        return node
+    if node['operator'] == '&&':
+        return node['right'] if left[1] else node['left']
+    return node['left'] if left[1] else node['right']
+
+
+def _unary_expression(node):
+    argument = _constant(node['argument'])
+    if argument is None:
+        return node
+    match node['operator']:
+        case '!':
+            return _literal(not argument[1])
+        case '-' if argument[0] == 'number' and node['argument']['type'] != 'NumericLiteral':
+            return _literal(-argument[1])
+        case '+' if argument[0] == 'number':
+            return _literal(argument[1])
+    return node
+
+
+def _if_statement(node):
+    test = _constant(node['test'])
+    if test is None:
+        return node
+    taken, dead = (node['consequent'], node['alternate']) if test[1] else (node['alternate'], node['consequent'])
+    for branch in (taken, dead):
+        if branch is not None and branch['type'] in _declarations:
+            return node
+    return taken if taken is not None else {'type': 'EmptyStatement'}
+
+
+def _folding(rule):
+    def leave(self, node):
+        folded = rule(node)
+        return node if folded is node else _replace(node, folded)
+
+    return leave
+
+
+class _Folder(Transformer):
+    leave_BinaryExpression = _folding(_binary_expression)
+    leave_LogicalExpression = _folding(_logical_expression)
+    leave_UnaryExpression = _folding(_unary_expression)
+    leave_IfStatement = _folding(_if_statement)
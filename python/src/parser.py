@@ -1,21 +1,124 @@
-from src.tokenizer import Tokenizer, TokenType as T, Token
+import sys
+from functools import partial
+from typing import Iterator
+from src.deferred import DeferredBlock
+from src.hashcons import NodeTable
+from src.numeric import NumericValue, to_int
+from src.symbols import SymbolTable
+from src.tokenizer import Tokenizer, TokenCursor, TokenList, TokenStream, TokenType as T, Token
+
+
+class LimitExceeded(ValueError):
+    """
+    A parse went past one of the limits given to `Parser.parse`; `limit`
+    names the argument and `maximum` is its value.
+    """
+
+    messages = {
+        'max_input_size': 'Input is longer than {} characters',
+        'max_tokens': 'Input has more than {} tokens',
+        'max_nodes': 'AST has more than {} nodes',
+        'max_depth': 'Input nests deeper than {} levels',
+    }
+
+    def __init__(self, limit: str, maximum: int):
+        super().__init__(self.messages[limit].format(maximum))
+        self.limit: str = limit
+        self.maximum: int = maximum
+
+
+def _stack_depth() -> int:
+    depth = 0
+    frame = sys._getframe(1)
+    while frame is not None:
+        depth += 1
+        frame = frame.f_back
+    return depth
 
 
 class Parser:
 
-    def __init__(self):
+    # Most Python frames one level of nesting takes: a parenthesized
+    # expression goes through every precedence level.
+    frames_per_level = 20
+
+    numbers = {
+        'int': to_int,
+        'lazy': NumericValue,
+        'raw': str,
+    }
+
+    def __init__(self, engine: str = 'regex', hash_cons: bool = False, lazy: bool = False, numbers: str = 'int'):
+        if hash_cons and lazy:
+            raise ValueError('Hash-consing needs complete subtrees, it cannot be lazy')
+        if numbers not in self.numbers:
+            raise ValueError(f'Unknown numbers mode: {numbers}')
+        self._engine: str = engine
+        self._hash_cons: bool = hash_cons
+        self._lazy: bool = lazy
+        self._numbers: str = numbers
+        self._number = self.numbers[numbers]
         self._string: str = ''
         self._tokenizer: Tokenizer or None = None
+        self._tokens: TokenStream or TokenCursor or None = None
         self._lookahead: Token or None = None
-
-    def parse(self, string) -> dict:
+        self.symbols: SymbolTable = SymbolTable()
+        self.nodes: NodeTable or None = None
+        # Parser of this parse's deferred bodies; in it, the tokens of all
+        # of them, the index of each brace's match and where the stream
+        # of the body being parsed begins.
+        self._bodies: Parser or None = None
+        self._skipped: list[Token] = []
+        self._closers: dict[int, int] = {}
+        self._start: int = 0
+        self._limit()
+
+    def parse(self, string, max_input_size: int = None, max_tokens: int = None, max_nodes: int = None,
+              max_depth: int = None) -> dict:
         """
         Parses a string into an AST.
-        """
+
+        Identifier names and string values are interned in a fresh
+        `symbols` table owned by this parse. With `hash_cons` the AST is
+        made of immutable `Node`s, identical subtrees shared through the
+        `nodes` table; `to_dict()` gives back the usual dict tree. With
+        `lazy` function and class bodies are `DeferredBlock`s, parsed on
+        first read.
+
+        NumericLiteral values follow `numbers`: 'int' converts the digits
+        right away, 'lazy' keeps them in a `NumericValue` that converts on
+        first use and 'raw' leaves them as the source text. Literals of
+        any length convert, past sys.int_max_str_digits too.
+
+        The limits bound the characters of `string`, the tokens read, the
+        AST nodes built and how deep statements and expressions nest. A
+        parse that goes past one stops there with `LimitExceeded`, before
+        its memory grows any further. Deferred bodies are held to the node
+        and depth limits when they are parsed: their nodes add to those of
+        the parse and of each other, and they nest on from where they are.
+
+        A level of nesting takes up to `frames_per_level` Python frames,
+        so `max_depth` is lowered to what sys.getrecursionlimit() leaves
+        room for, some 45 levels under the default limit of 1000; raise
+        that for deeper input.
+        """
+        if max_input_size is not None and len(string) > max_input_size:
+            raise LimitExceeded('max_input_size', max_input_size)
+        if max_depth is not None:
+            max_depth = min(max_depth, (sys.getrecursionlimit() - _stack_depth()) // self.frames_per_level - 1)
+        self._limit(max_tokens, max_nodes, max_depth)
         self._string = string
-        self._tokenizer = Tokenizer(string)
-        self._lookahead = self._tokenizer.get_next_token()
-        return self.program()
+        self.symbols = SymbolTable()
+        self.nodes = NodeTable() if self._hash_cons else None
+        self._tokenizer = Tokenizer(string, self._engine)
+        self._tokens = TokenStream(self._tokenizer)
+        self._lookahead = self._tokens.peek()
+        self._bodies = None
+        ast = self.program()
+        if self._bodies is not None:
+            # Deferred bodies count on from the nodes of the whole parse.
+            self._bodies._node_count = self._node_count
+        return ast
 
     def program(self) -> dict:
         """
@@ -25,10 +128,26 @@ class Parser:
         #   : StatementList
         #   ;
         """
-        return {
+        return self._node({
             'type': 'Program',
             'body': self.statement_list()
-        }
+        })
+
+    def statements(self, tokens: list[Token], start: int = 0) -> Iterator[tuple[dict, int]]:
+        """
+        Parses top-level statements from tokens scanned earlier, beginning
+        at index `start`, and yields each with the index one past its last
+        token. Symbols are interned as for `parse`.
+        """
+        self.symbols = SymbolTable()
+        self.nodes = NodeTable() if self._hash_cons else None
+        self._limit()
+        self._bodies = None
+        self._tokens = TokenStream(TokenList(tokens, start))
+        self._lookahead = self._tokens.peek()
+        while self._lookahead is not None:
+            statement = self.statement()
+            yield statement, start + self._tokens.position
 
     def statement_list(self, stop_lookahead=None) -> list:
         """
@@ -56,25 +175,30 @@ class Parser:
           | ClassDeclaration
           ;
         """
+        self._depth += 1
+        if self._depth > self._max_depth:
+            raise LimitExceeded('max_depth', self._max_depth)
         match self._lookahead.type:
             case T.SEMI:
-                return self.empty_statement()
+                statement = self.empty_statement()
             case T.LBRACE:
-                return self.block_statement()
+                statement = self.block_statement()
             case T.LET:
-                return self.variable_statement()
+                statement = self.variable_statement()
             case T.DEF:
-                return self.function_declaration()
+                statement = self.function_declaration()
             case T.CLASS:
-                return self.class_declaration()
+                statement = self.class_declaration()
             case T.RETURN:
-                return self.return_statement()
+                statement = self.return_statement()
             case T.IF:
-                return self.if_statement()
+                statement = self.if_statement()
             case T.WHILE | T.DO | T.FOR:
-                return self.iteration_statement()
+                statement = self.iteration_statement()
             case _:
-                return self.expression_statement()
+                statement = self.expression_statement()
+        self._depth -= 1
+        return statement
 
     def class_declaration(self) -> dict:
         """
@@ -85,13 +209,13 @@ class Parser:
         self._eat(T.CLASS)
         id = self.identifier()
         super_class = self.class_extends() if self._lookahead.type == T.EXTENDS else None
-        body = self.block_statement()
-        return {
+        body = self._deferred_block() if self._lazy else self.block_statement()
+        return self._node({
             'type': 'ClassDeclaration',
             'id': id,
             'superClass': super_class,
             'body': body
-        }
+        })
 
     def class_extends(self) -> dict:
         """
@@ -113,13 +237,13 @@ class Parser:
         self._eat(T.LPAR)
         params = self.formal_parameter_list() if self._lookahead.type != T.RPAR else []
         self._eat(T.RPAR)
-        body = self.block_statement()
-        return {
+        body = self._deferred_block() if self._lazy else self.block_statement()
+        return self._node({
             'type': 'FunctionDeclaration',
             'name': name,
             'params': params,
             'body': body
-        }
+        })
 
     def formal_parameter_list(self):
         """
@@ -147,10 +271,10 @@ class Parser:
         self._eat(T.RETURN)
         argument = self.expression() if self._lookahead.type != T.SEMI else None
         self._eat(T.SEMI)
-        return {
+        return self._node({
             'type': 'ReturnStatement',
             'argument': argument
-        }
+        })
 
     def iteration_statement(self):
         """
@@ -180,11 +304,11 @@ class Parser:
         self._eat(T.RPAR)
 
         body = self.statement()
-        return {
+        return self._node({
             'type': 'WhileStatement',
             'test': test,
             'body': body
-        }
+        })
 
     def do_while_statement(self) -> dict:
         """
@@ -200,11 +324,11 @@ class Parser:
         self._eat(T.RPAR)
         self._eat(T.SEMI)
 
-        return {
+        return self._node({
             'type': 'DoWhileStatement',
             'test': test,
             'body': body
-        }
+        })
 
     def for_statement(self):
         """
@@ -226,13 +350,13 @@ class Parser:
 
         body = self.statement()
 
-        return {
+        return self._node({
             'type': 'ForStatement',
             'init': init,
             'test': test,
             'update': update,
             'body': body
-        }
+        })
 
     def for_statement_init(self):
         """
@@ -261,12 +385,12 @@ class Parser:
         alternate = self._eat(T.ELSE) and self.statement() \
             if self._lookahead is not None and self._lookahead.type == T.ELSE \
             else None
-        return {
+        return self._node({
             'type': 'IfStatement',
             'test': test,
             'consequent': consequent,
             'alternate': alternate
-        }
+        })
 
     def variable_statement_init(self):
         """
@@ -276,10 +400,10 @@ class Parser:
         """
         self._eat(T.LET)
         declarations = self.variable_declaration_list()
-        return {
+        return self._node({
             'type': 'VariableStatement',
             'declarations': declarations
-        }
+        })
 
     def variable_statement(self) -> dict:
         """
@@ -318,11 +442,11 @@ class Parser:
             init = self.variable_initializer()
         else:
             init = None
-        return {
+        return self._node({
             'type': 'VariableDeclaration',
             'id': _id,
             'init': init
-        }
+        })
 
     def variable_initializer(self):
         """
@@ -335,9 +459,9 @@ class Parser:
 
     def empty_statement(self) -> dict:
         self._eat(T.SEMI)
-        return {
+        return self._node({
             'type': 'EmptyStatement'
-        }
+        })
 
     def block_statement(self) -> dict:
         """
@@ -347,10 +471,72 @@ class Parser:
         self._eat(T.LBRACE)
         body = self.statement_list(T.RBRACE) if self._lookahead.type != T.RBRACE else []
         self._eat(T.RBRACE)
-        return {
+        return self._node({
             'type': 'BlockStatement',
             'body': body
-        }
+        })
+
+    def _deferred_block(self) -> DeferredBlock:
+        """
+        Matches the braces of a BlockStatement at the token level and
+        keeps its tokens to be parsed on first read.
+
+        The tokens go into a list shared by all deferred bodies of the
+        parse, along with the index of each brace's match, and one parser
+        parses the bodies from there. A body within a body is skipped
+        over by that index, not matched and copied again.
+        """
+        token = self._lookahead
+        if token is None or token.type != T.LBRACE:
+            self._eat(T.LBRACE)
+        bodies = self._bodies
+        if bodies is None:
+            bodies = self._bodies = Parser(self._engine, lazy=True, numbers=self._numbers)
+            bodies._limit(None, self._max_nodes, self._max_depth)
+            bodies.symbols = self.symbols
+            bodies._bodies = bodies
+        tokens = bodies._skipped
+        closers = bodies._closers
+
+        if bodies is self:
+            start = self._start + self._tokens.position
+            end = closers[start]
+            self._lookahead = self._tokens.skip(end + 1 - start)
+        else:
+            start = len(tokens)
+            append = tokens.append
+            advance = self._tokens.advance
+            position = self._tokens.position
+            opened = []
+            while True:
+                if token is None:
+                    raise SyntaxError(f'Unexpected end of input, expected: {T.RBRACE}')
+                if token.type == T.LBRACE:
+                    opened.append(len(tokens))
+                elif token.type == T.RBRACE:
+                    closers[opened.pop()] = len(tokens)
+                append(token)
+                token = advance()
+                position += 1
+                if position > self._max_tokens:
+                    raise LimitExceeded('max_tokens', self._max_tokens)
+                if not opened:
+                    break
+            self._lookahead = token
+            end = len(tokens) - 1
+        # The body goes on from the depth it is at here.
+        return DeferredBlock((tokens[start].start, tokens[end].end), partial(bodies._block, start, end, self._depth))
+
+    def _block(self, start: int, end: int, depth: int) -> dict:
+        """
+        Parses the deferred block from token `start` to `end`, at nesting
+        `depth`.
+        """
+        self._tokens = TokenCursor(self._skipped, start, end + 1)
+        self._start = start
+        self._depth = depth
+        self._lookahead = self._tokens.peek()
+        return self.block_statement()
 
     def expression_statement(self) -> dict:
         """
@@ -360,10 +546,10 @@ class Parser:
         """
         expression = self.expression()
         self._eat(T.SEMI)
-        return {
+        return self._node({
             'type': 'ExpressionStatement',
             'expression': expression
-        }
+        })
 
     def additive_expression(self) -> dict:
         """
@@ -400,12 +586,12 @@ class Parser:
         while self._lookahead.type == operator_token:
             operator = self._eat(operator_token).value
             right = getattr(self, builder_name)()
-            left = {
+            left = self._node({
                 'type': 'LogicalExpression',
                 'operator': operator,
                 'left': left,
                 'right': right
-            }
+            })
         return left
 
     def _binary_expression(self, builder_name, operator_token: T) -> dict:
@@ -418,12 +604,12 @@ class Parser:
         while self._lookahead.type == operator_token:
             operator = self._eat(operator_token).value
             right = getattr(self, builder_name)()
-            left = {
+            left = self._node({
                 'type': 'BinaryExpression',
                 'operator': operator,
                 'left': left,
                 'right': right
-            }
+            })
         return left
 
     def unary_expression(self) -> dict:
@@ -439,13 +625,18 @@ class Parser:
             operator = self._eat(T.ADDITIVE_OPERATOR).value
         elif self._lookahead.type == T.NOT:
             operator = self._eat(T.NOT).value
-        if operator is not None:
-            return {
-                'type': 'UnaryExpression',
-                'operator': operator,
-                'argument': self.unary_expression()  # --x
-            }
-        return self.left_hand_side_expression()
+        if operator is None:
+            return self.left_hand_side_expression()
+        self._depth += 1
+        if self._depth > self._max_depth:
+            raise LimitExceeded('max_depth', self._max_depth)
+        argument = self.unary_expression()  # --x
+        self._depth -= 1
+        return self._node({
+            'type': 'UnaryExpression',
+            'operator': operator,
+            'argument': argument
+        })
 
     def primary_expression(self) -> dict:
         """
@@ -478,11 +669,17 @@ class Parser:
           ;
         """
         self._eat(T.NEW)
-        return {
+        self._depth += 1
+        if self._depth > self._max_depth:
+            raise LimitExceeded('max_depth', self._max_depth)
+        callee = self.member_expression()
+        arguments = self.arguments()
+        self._depth -= 1
+        return self._node({
             'type': 'NewExpression',
-            'callee': self.member_expression(),
-            'arguments': self.arguments()
-        }
+            'callee': callee,
+            'arguments': arguments
+        })
 
     def this_expression(self) -> dict:
         """
@@ -491,9 +688,9 @@ class Parser:
           ;
         """
         self._eat(T.THIS)
-        return {
+        return self._node({
             'type': 'ThisExpression'
-        }
+        })
 
     def super(self) -> dict:
         """
@@ -502,9 +699,9 @@ class Parser:
           ;
         """
         self._eat(T.SUPER)
-        return {
+        return self._node({
             'type': 'Super'
-        }
+        })
 
     @staticmethod
     def _is_literal(token_type: T) -> bool:
@@ -536,15 +733,19 @@ class Parser:
           | LeftHandSideExpression AssignmentOperator AssignmentExpression
           ;
         """
+        self._depth += 1
+        if self._depth > self._max_depth:
+            raise LimitExceeded('max_depth', self._max_depth)
         left = self.logical_OR_expression()
-        if not self._is_assignment_operator(self._lookahead.type):
-            return left
-        return {
-            'type': 'AssignmentExpression',
-            'operator': self.assignment_operator().value,
-            'left': self._check_valid_assignment_target(left),
-            'right': self.assignment_expression()
-        }
+        if self._is_assignment_operator(self._lookahead.type):
+            left = self._node({
+                'type': 'AssignmentExpression',
+                'operator': self.assignment_operator().value,
+                'left': self._check_valid_assignment_target(left),
+                'right': self.assignment_expression()
+            })
+        self._depth -= 1
+        return left
 
     def left_hand_side_expression(self):
         """
@@ -584,14 +785,18 @@ class Parser:
           | CallExpression
           ;
         """
-        call_expression = {
+        call_expression = self._node({
             'type': 'CallExpression',
             'callee': callee,
             'arguments': self.arguments()
-        }
+        })
 
-        if self._lookahead.type == T.LPAR:
-            call_expression = self._call_expression(call_expression)
+        while self._lookahead.type == T.LPAR:
+            call_expression = self._node({
+                'type': 'CallExpression',
+                'callee': call_expression,
+                'arguments': self.arguments()
+            })
 
         return call_expression
 
@@ -633,23 +838,23 @@ class Parser:
             if self._lookahead.type == T.DOT:
                 self._eat(T.DOT)
                 _property = self.identifier()
-                _object = {
+                _object = self._node({
                     'type': 'MemberExpression',
                     'computed': False,
                     'object': _object,
                     'property': _property
-                }
+                })
 
             if self._lookahead.type == T.LSQB:
                 self._eat(T.LSQB)
                 _property = self.expression()
                 self._eat(T.RSQB)
-                _object = {
+                _object = self._node({
                     'type': 'MemberExpression',
                     'computed': True,
                     'object': _object,
                     'property': _property
-                }
+                })
         return _object
 
     def identifier(self):
@@ -658,11 +863,11 @@ class Parser:
           : IDENTIFIER
           ;
         """
-        name = self._eat(T.IDENTIFIER).value
-        return {
+        name = self.symbols.identifier(self._eat(T.IDENTIFIER).value)
+        return self._node({
             'type': 'Identifier',
             'name': name
-        }
+        })
 
     @staticmethod
     def _check_valid_assignment_target(node):
@@ -775,10 +980,10 @@ class Parser:
           ;
         """
         self._eat(T.TRUE if value else T.FALSE)
-        return {
+        return self._node({
             'type': 'BooleanLiteral',
             'value': value
-        }
+        })
 
     def null_literal(self):
         """
@@ -787,30 +992,48 @@ class Parser:
           ;
         """
         self._eat(T.NULL)
-        return {
+        return self._node({
             'type': 'NullLiteral',
             'value': None
-        }
+        })
 
     def string_literal(self) -> dict:
         """
         StringLiteral
         """
         token = self._eat(T.STRING)
-        return {
+        return self._node({
             'type': 'StringLiteral',
-            'value': token.value[1:-1]
-        }
+            'value': self.symbols.string(token.value)
+        })
 
     def numeric_literal(self) -> dict:
         """
         NumericLiteral
         """
         token = self._eat(T.NUMBER)
-        return {
+        return self._node({
             'type': 'NumericLiteral',
-            'value': int(token.value)
-        }
+            'value': self._number(token.value)
+        })
+
+    def _limit(self, max_tokens: int = None, max_nodes: int = None, max_depth: int = None):
+        self._max_tokens: int = sys.maxsize if max_tokens is None else max_tokens
+        self._max_nodes: int = sys.maxsize if max_nodes is None else max_nodes
+        self._max_depth: int = sys.maxsize if max_depth is None else max_depth
+        self._node_count: int = 0
+        self._depth: int = 0
+
+    def _node(self, node: dict) -> dict:
+        """
+        Every AST node passes through here once built.
+        """
+        self._node_count += 1
+        if self._node_count > self._max_nodes:
+            raise LimitExceeded('max_nodes', self._max_nodes)
+        if self.nodes is not None:
+            return self.nodes.make(node)
+        return node
 
     def _eat(self, token_type: T) -> Token:
         token = self._lookahead
@@ -818,5 +1041,7 @@ class Parser:
             raise SyntaxError(f'Unexpected end of input, expected: {token_type}')
         if token_type != token.type:
             raise SyntaxError(f'Unexpected token: {token.value}, expected {token_type}')
-        self._lookahead = self._tokenizer.get_next_token()
+        self._lookahead = self._tokens.advance()
+        if self._tokens.position > self._max_tokens:
+            raise LimitExceeded('max_tokens', self._max_tokens)
         return token
@@ -0,0 +1,93 @@
+import re
+from bisect import bisect_right
+
+import numpy as np
+
+# Character classes found by the prescan, as bit flags.
+SPACE = 1
+DIGIT = 2
+WORD = 4
+NON_ASCII = 8
+
+_table = np.zeros(256, dtype=np.uint8)
+for _code in range(128):
+    _char = chr(_code)
+    _table[_code] = (SPACE if re.match(r'\s', _char) else 0) \
+        | (DIGIT if re.match(r'\d', _char) else 0) \
+        | (WORD if re.match(r'\w', _char) else 0)
+_table[128:] = NON_ASCII
+
+
+class _Window:
+    """
+    Classified slice [start, end) of the input with its runs of spaces,
+    digits and word characters.
+    """
+
+    def __init__(self, string: str, start: int, end: int):
+        self.start: int = start
+        self.end: int = end
+        chunk = string[start:end]
+        if chunk.isascii():
+            codes = np.frombuffer(chunk.encode('ascii'), dtype=np.uint8)
+        else:
+            codes = np.minimum(np.frombuffer(chunk.encode('utf-32-le'), dtype=np.uint32), 255)
+        flags = _table[codes]
+        self.flags: bytes = flags.tobytes()
+        self.runs: dict[int, tuple[list, list]] = {}
+        for kind in (SPACE, DIGIT, WORD):
+            edges = np.diff(np.concatenate(([0], (flags & kind) != 0, [0])).astype(np.int8))
+            self.runs[kind] = (
+                (np.flatnonzero(edges == 1) + start).tolist(),
+                (np.flatnonzero(edges == -1) + start).tolist(),
+            )
+
+
+class Prescan:
+    """
+    Bulk classification of the input with NumPy.
+
+    The input is processed in windows: every character is classified in
+    one vectorized lookup and the boundaries of whitespace, digit and
+    word character runs fall out of a diff over the class masks. The
+    tokenizer then reads candidate token ends instead of matching
+    character by character. A run cut by the window end is reported as
+    unknown, as is anything involving non-ASCII characters, so that the
+    caller falls back to the spec.
+    """
+
+    def __init__(self, string: str, window: int = 1 << 20):
+        self._string: str = string
+        self._size: int = window
+        self._window: _Window or None = None
+
+    def _at(self, position: int) -> _Window:
+        window = self._window
+        if window is None or not window.start <= position < window.end:
+            start = position - position % self._size
+            window = self._window = _Window(self._string, start, min(start + self._size, len(self._string)))
+        return window
+
+    def flags(self, position: int) -> int:
+        """
+        Class flags of the character at the position.
+        """
+        window = self._at(position)
+        return window.flags[position - window.start]
+
+    def run_end(self, kind: int, position: int) -> int or None:
+        """
+        End of the run of `kind` characters containing the position, or
+        None if the prescan cannot tell.
+        """
+        window = self._at(position)
+        starts, ends = window.runs[kind]
+        index = bisect_right(ends, position)
+        if index == len(ends) or starts[index] > position:
+            return None
+        end = ends[index]
+        if end == window.end:
+            return end if end == len(self._string) else None
+        if window.flags[end - window.start] & NON_ASCII:
+            return None
+        return end
@@ -0,0 +1,240 @@
+from array import array
+from collections.abc import Mapping
+from src.visitor import child_fields
+
+# Scope kinds. A program or function scope gets a frame; block scopes
+# (blocks and for statements) number their bindings in the enclosing one.
+PROGRAM = 0
+FUNCTION = 1
+BLOCK = 2
+
+# Binding kinds.
+VARIABLE = 0
+PARAMETER = 1
+FUNCTION_NAME = 2
+CLASS_NAME = 3
+
+# Entries of `Resolution.identifiers` that are not binding ids.
+GLOBAL = -1
+PROPERTY = -2
+
+_EXIT = 0
+_NODE = 1
+_PROPERTY = 2
+_METHOD = 3
+
+
+class Resolution:
+    """
+    Scope tree and bindings of a program, in flat arrays.
+
+    Scopes and bindings are numbered in source order. For scope `s`,
+    `parents[s]` is the enclosing scope (-1 for the program) and
+    `scope_kinds[s]` one of PROGRAM, FUNCTION and BLOCK. For binding `b`,
+    `names[b]` is its name, `binding_kinds[b]` one of VARIABLE,
+    PARAMETER, FUNCTION_NAME and CLASS_NAME, `scopes[b]` the scope that
+    declares it, `slots[b]` its index among the bindings of the enclosing
+    program or function scope (the frame it lives in) and `references[b]`
+    how many identifiers other than its declarations refer to it.
+
+    `identifiers[i]` is the binding id of the i-th Identifier of the
+    tree in source order: GLOBAL for a name no scope declares, PROPERTY
+    for a property or method name, which is not a variable at all.
+    `binding(node)` looks one up by node; that needs every Identifier to
+    be its own object, so it is only available for plain dict trees.
+    """
+
+    def __init__(self):
+        self.parents: array = array('i')
+        self.scope_kinds: array = array('b')
+        self.names: list[str] = []
+        self.binding_kinds: array = array('b')
+        self.scopes: array = array('i')
+        self.slots: array = array('i')
+        self.references: array = array('i')
+        self.identifiers: array = array('i')
+        self.globals: dict[str, int] = {}
+        self._positions: dict[int, int] or None = {}
+        self._nodes: list[Mapping] = []
+
+    def binding(self, identifier: Mapping) -> int:
+        """
+        Binding id of an Identifier node of the tree, or GLOBAL or
+        PROPERTY.
+        """
+        if self._positions is None:
+            raise ValueError('Identifier nodes are shared; look bindings up by position')
+        return self.identifiers[self._positions[id(identifier)]]
+
+    def declaration(self, binding: int) -> Mapping:
+        """
+        The Identifier node that first declares a binding.
+        """
+        return self._nodes[binding]
+
+
+class _Scope:
+
+    def __init__(self, number: int, parent: '_Scope' or None, kind: int):
+        self.number: int = number
+        self.parent: _Scope or None = parent
+        self.names: dict[str, int] = {}
+        self.frame: _Scope = self if kind != BLOCK else parent.frame
+        self.size: int = 0
+
+
+class _Resolver:
+
+    def __init__(self):
+        self.result = Resolution()
+        self.scope: _Scope or None = None
+
+    def enter(self, kind: int):
+        result = self.result
+        self.scope = _Scope(len(result.parents), self.scope, kind)
+        result.parents.append(self.scope.parent.number if self.scope.parent is not None else -1)
+        result.scope_kinds.append(kind)
+
+    def declare(self, name: str, kind: int, node: Mapping) -> int:
+        scope = self.scope
+        binding = scope.names.get(name)
+        if binding is None:
+            result = self.result
+            binding = scope.names[name] = len(result.names)
+            result.names.append(name)
+            result.binding_kinds.append(kind)
+            result.scopes.append(scope.number)
+            result.slots.append(scope.frame.size)
+            result.references.append(0)
+            result._nodes.append(node)
+            scope.frame.size += 1
+        return binding
+
+    def hoist(self, statements):
+        """
+        Declares what a block introduces on entry, as the evaluator does,
+        so that a name refers to its block's binding throughout the block.
+        """
+        for statement in statements:
+            match statement['type']:
+                case 'VariableStatement':
+                    for declaration in statement['declarations']:
+                        self.declare(declaration['id']['name'], VARIABLE, declaration['id'])
+                case 'FunctionDeclaration':
+                    self.declare(statement['name']['name'], FUNCTION_NAME, statement['name'])
+                case 'ClassDeclaration':
+                    self.declare(statement['id']['name'], CLASS_NAME, statement['id'])
+
+    def occurrence(self, node: Mapping, binding: int):
+        result = self.result
+        if result._positions is not None:
+            if id(node) in result._positions:
+                result._positions = None
+            else:
+                result._positions[id(node)] = len(result.identifiers)
+        result.identifiers.append(binding)
+
+    def declaration(self, node: Mapping, kind: int):
+        self.occurrence(node, self.declare(node['name'], kind, node))
+
+    def reference(self, node: Mapping):
+        name = node['name']
+        scope = self.scope
+        while scope is not None:
+            binding = scope.names.get(name)
+            if binding is not None:
+                self.result.references[binding] += 1
+                self.occurrence(node, binding)
+                return
+            scope = scope.parent
+        result = self.result
+        result.globals[name] = result.globals.get(name, 0) + 1
+        self.occurrence(node, GLOBAL)
+
+    def run(self, ast: Mapping) -> Resolution:
+        stack = [(_NODE, ast)]
+        pop = stack.pop
+        push = stack.append
+
+        while stack:
+            action, node = pop()
+            if action == _EXIT:
+                self.scope = self.scope.parent
+                continue
+            if action == _PROPERTY:
+                self.occurrence(node, PROPERTY)
+                continue
+            if action == _METHOD:
+                self.occurrence(node['name'], PROPERTY)
+                self.function(node, push)
+                continue
+
+            match node['type']:
+                case 'Identifier':
+                    self.reference(node)
+                case 'Program':
+                    self.enter(PROGRAM)
+                    self.hoist(node['body'])
+                    push((_EXIT, None))
+                    self.children(node['body'], push)
+                case 'BlockStatement':
+                    self.enter(BLOCK)
+                    self.hoist(node['body'])
+                    push((_EXIT, None))
+                    self.children(node['body'], push)
+                case 'ForStatement':
+                    self.enter(BLOCK)
+                    push((_EXIT, None))
+                    self.children([node['init'], node['test'], node['update'], node['body']], push)
+                case 'VariableDeclaration':
+                    self.declaration(node['id'], VARIABLE)
+                    if node['init'] is not None:
+                        push((_NODE, node['init']))
+                case 'FunctionDeclaration':
+                    self.declaration(node['name'], FUNCTION_NAME)
+                    self.function(node, push)
+                case 'ClassDeclaration':
+                    self.declaration(node['id'], CLASS_NAME)
+                    for member in reversed(node['body']['body']):
+                        if member['type'] != 'FunctionDeclaration':
+                            raise SyntaxError(f'Unexpected {member["type"]} in body of class {node["id"]["name"]}')
+                        push((_METHOD, member))
+                    if node['superClass'] is not None:
+                        push((_NODE, node['superClass']))
+                case 'MemberExpression':
+                    push((_NODE, node['property']) if node['computed'] else (_PROPERTY, node['property']))
+                    push((_NODE, node['object']))
+                case _:
+                    children = []
+                    for field in child_fields(node):
+                        value = node[field]
+                        if isinstance(value, (list, tuple)):
+                            children.extend(value)
+                        else:
+                            children.append(value)
+                    self.children(children, push)
+        return self.result
+
+    def function(self, node: Mapping, push):
+        self.enter(FUNCTION)
+        for param in node['params']:
+            self.declaration(param, PARAMETER)
+        push((_EXIT, None))
+        push((_NODE, node['body']))
+
+    @staticmethod
+    def children(nodes, push):
+        for node in reversed(nodes):
+            if node is not None:
+                push((_NODE, node))
+
+
+def resolve(ast: Mapping) -> Resolution:
+    """
+    Resolves every Identifier of a Program to the declaration it refers
+    to, following the scoping rules of the evaluator: blocks, for
+    statements and functions open scopes, and the variables, functions
+    and classes of a block are in scope throughout it. One pass over the
+    tree, without recursion.
+    """
+    return _Resolver().run(ast)
@@ -0,0 +1,38 @@
+import sys
+
+
+class SymbolTable:
+    """
+    Interned identifier names and string literal values of one parse
+    session, with the number of times each occurs.
+
+    Every occurrence of a name or value in the AST is the same str
+    object, so repeated names cost one string and comparing them is an
+    identity check.
+    """
+
+    def __init__(self):
+        self.identifiers: dict[str, int] = {}
+        self.strings: dict[str, int] = {}
+        self._quoted: dict[str, str] = {}
+        self._values: dict[str, str] = {}
+
+    def identifier(self, name: str) -> str:
+        """
+        Interns an identifier name and counts the occurrence.
+        """
+        name = sys.intern(name)
+        self.identifiers[name] = self.identifiers.get(name, 0) + 1
+        return name
+
+    def string(self, quoted: str) -> str:
+        """
+        Interns the value of a string literal token, quotes included, and
+        counts the occurrence. Only the first occurrence is sliced.
+        """
+        value = self._quoted.get(quoted)
+        if value is None:
+            value = quoted[1:-1]
+            value = self._quoted[quoted] = self._values.setdefault(value, value)
+        self.strings[value] = self.strings.get(value, 0) + 1
+        return value
@@ -1,6 +1,14 @@
 import re
+from functools import cache
 from typing import NamedTuple
 from enum import IntEnum, auto
+from src.dfa import DFA, Scanner
+
+try:
+    from src.prescan import Prescan, SPACE, DIGIT, WORD
+except ImportError:
+    # NumPy is optional, only the numpy engine needs it.
+    Prescan = None
 
 
 class TokenType(IntEnum):
@@ -47,6 +55,11 @@ class TokenType(IntEnum):
 class Token(NamedTuple):
     type: TokenType or None
     value: str
+    start: int = 0
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.value)
 
 
 # Tokenizer spec.
@@ -134,18 +147,81 @@ spec: list[tuple[re.Pattern, TokenType or None]] = [
 ]
 
 
+@cache
+def _dfa() -> DFA:
+    """
+    The spec compiled into a single automaton, built on first use.
+    """
+    return DFA.compile([regexp for regexp, _ in spec])
+
+
+@cache
+def _types() -> tuple[TokenType or None, ...]:
+    return tuple(token_type for _, token_type in spec)
+
+
+@cache
+def _pattern() -> re.Pattern:
+    """
+    The spec as one alternation, matched in place: the n-th group is the
+    n-th rule. At the cursor a leading `\\b` would see the previous
+    character, which slicing hides; drop it.
+    """
+    return re.compile('|'.join('(' + regexp.removeprefix(r'\b') + ')' for regexp, _ in spec))
+
+
+# Keyword spellings, looked up once a whole word has been read.
+keywords: dict[str, TokenType] = {
+    matched.group(1): token_type
+    for regexp, token_type in spec
+    if (matched := re.fullmatch(r'\\b(\w+)\\b', regexp))
+}
+
+
 class Tokenizer:
-    def __init__(self, string):
+    """
+    Engines:
+      regex: tries the spec patterns in order with `re`.
+      dfa: runs the spec compiled into a DFA, longest match first and
+           spec order between matches of equal length, in linear time.
+      numpy: classifies the input in bulk with NumPy (see `src.prescan`)
+             and only falls back to the spec for punctuation, operators,
+             strings and comments.
+    """
+
+    engines = ('regex', 'dfa', 'numpy')
+
+    def __init__(self, string, engine: str = 'regex'):
+        if engine not in self.engines:
+            raise ValueError(f'Unknown tokenizer engine: {engine}')
         self._string: str = string
         self._cursor: int = 0
+        self._scanner: Scanner or None = Scanner(_dfa(), string) if engine == 'dfa' else None
+        self._prescan: Prescan or None = None
+        if engine == 'numpy':
+            if Prescan is None:
+                raise ImportError('The numpy tokenizer engine requires NumPy')
+            self._prescan = Prescan(string)
 
     def has_more_tokens(self) -> bool:
         return self._cursor < len(self._string)
 
+    def seek(self, cursor: int):
+        """
+        Continues scanning at `cursor`, which must be where a token or the
+        whitespace and comments between tokens begin.
+        """
+        self._cursor = cursor
+
     def get_next_token(self) -> Token or None:
         if not self.has_more_tokens():
             return None
-        string = self._string[self._cursor:]
+        if self._scanner is not None:
+            return self._scan()
+        if self._prescan is not None:
+            return self._prescanned()
+        start = self._cursor
+        string = self._string[start:]
 
         for regexp, token_type in spec:
             token_value = self._match(regexp, string)
@@ -153,7 +229,7 @@ class Tokenizer:
                 continue
             if token_type is None:
                 return self.get_next_token()
-            return Token(type=token_type, value=token_value)
+            return Token(type=token_type, value=token_value, start=start)
         raise SyntaxError(f'Unexpected token: "{string[0]}"')
 
     def _match(self, regexp, string) -> str or None:
@@ -162,3 +238,233 @@ class Tokenizer:
             return None
         self._cursor += len(matched.group(0))
         return matched.group(0)
+
+    def read_tokens(self, tokens: list[Token], count: int) -> bool:
+        """
+        Appends up to `count` next tokens to the list and tells whether
+        input remains. On a SyntaxError the tokens before the offending
+        one are already in the list.
+        """
+        if self._scanner is None:
+            for _ in range(count):
+                token = self.get_next_token()
+                if token is None:
+                    return False
+                tokens.append(token)
+            return True
+
+        string, match, types = self._string, self._scanner.match, _types()
+        cursor, length = self._cursor, len(string)
+        limit = len(tokens) + count
+        try:
+            while cursor < length and len(tokens) < limit:
+                rule, end = match(cursor)
+                if rule < 0:
+                    raise SyntaxError(f'Unexpected token: "{string[cursor]}"')
+                if types[rule] is not None:
+                    tokens.append(Token(types[rule], string[cursor:end], cursor))
+                cursor = end
+        finally:
+            self._cursor = cursor
+        return cursor < length
+
+    def _scan(self) -> Token or None:
+        while self.has_more_tokens():
+            rule, end = self._scanner.match(self._cursor)
+            if rule < 0:
+                raise SyntaxError(f'Unexpected token: "{self._string[self._cursor]}"')
+            start, self._cursor = self._cursor, end
+            token_type = spec[rule][1]
+            if token_type is not None:
+                return Token(type=token_type, value=self._string[start:end], start=start)
+        return None
+
+    def _prescanned(self) -> Token or None:
+        while self.has_more_tokens():
+            start = self._cursor
+            flags = self._prescan.flags(start)
+            kind = SPACE if flags & SPACE else DIGIT if flags & DIGIT else WORD if flags & WORD else 0
+            end = self._prescan.run_end(kind, start) if kind else None
+            if end is None:
+                token_type, end = self._match_at(start)
+            elif kind == SPACE:
+                token_type = None
+            elif kind == DIGIT:
+                token_type = TokenType.NUMBER
+            else:
+                token_type = keywords.get(self._string[start:end], TokenType.IDENTIFIER)
+            self._cursor = end
+            if token_type is not None:
+                return Token(type=token_type, value=self._string[start:end], start=start)
+        return None
+
+    def _match_at(self, cursor: int) -> tuple[TokenType or None, int]:
+        matched = _pattern().match(self._string, cursor)
+        if matched:
+            return spec[matched.lastindex - 1][1], matched.end()
+        raise SyntaxError(f'Unexpected token: "{self._string[cursor]}"')
+
+
+class TokenList:
+    """
+    Replays tokens scanned earlier, in place of a tokenizer.
+    """
+
+    def __init__(self, tokens: list[Token], start: int = 0):
+        self._tokens: list[Token] = tokens
+        self._cursor: int = start
+
+    def read_tokens(self, tokens: list[Token], count: int) -> bool:
+        chunk = self._tokens[self._cursor:self._cursor + count]
+        tokens.extend(chunk)
+        self._cursor += len(chunk)
+        return self._cursor < len(self._tokens)
+
+
+class TokenCursor:
+    """
+    A `TokenStream` over tokens scanned earlier, from index `start` up to
+    `end`, that reads the list in place: nothing is buffered and any
+    position can be returned to.
+    """
+
+    def __init__(self, tokens: list[Token], start: int = 0, end: int = None):
+        self._tokens: list[Token] = tokens
+        self._start: int = start
+        self._end: int = len(tokens) if end is None else end
+        self._head: int = start
+
+    def peek(self, k: int = 0) -> Token or None:
+        position = self._head + k
+        return self._tokens[position] if position < self._end else None
+
+    def advance(self) -> Token or None:
+        self._head += 1
+        return self._tokens[self._head] if self._head < self._end else None
+
+    def skip(self, count: int) -> Token or None:
+        """
+        Moves `count` tokens on and returns the token there.
+        """
+        self._head += count
+        return self.peek()
+
+    @property
+    def position(self) -> int:
+        return self._head - self._start
+
+    def mark(self) -> int:
+        return self._head
+
+    def reset(self, mark: int):
+        self._head = mark
+
+    def release(self, mark: int):
+        pass
+
+
+class TokenStream:
+    """
+    Tokens ahead of the parser, pulled from the tokenizer in batches into
+    a ring buffer.
+
+    `peek(k)` looks k tokens past the current one without consuming
+    anything. `mark()` pins the current position and `reset(mark)`
+    returns to it, so the parser can try a production and backtrack
+    without the source being scanned again; tokens before the oldest
+    mark are overwritten as the stream moves on. A tokenizer error is
+    only raised once the stream reaches its position, as it would be
+    reading one token at a time.
+    """
+
+    def __init__(self, tokenizer: Tokenizer or TokenList, batch: int = 64):
+        if batch < 1 or batch & (batch - 1):
+            raise ValueError(f'Batch size must be a power of two: {batch}')
+        self._tokenizer: Tokenizer or TokenList = tokenizer
+        self._batch: int = batch
+        self._buffer: list[Token or None] = [None] * 2 * batch
+        self._mask: int = len(self._buffer) - 1
+        # Absolute positions: current token and one past the last buffered.
+        self._head: int = 0
+        self._tail: int = 0
+        self._marks: list[int] = []
+        self._done: bool = False
+        self._error: SyntaxError or None = None
+
+    def peek(self, k: int = 0) -> Token or None:
+        """
+        The k-th token after the current one, None past the end of input.
+        """
+        position = self._head + k
+        while position >= self._tail:
+            if self._done:
+                if self._error is not None:
+                    raise self._error
+                return None
+            self._refill()
+        return self._buffer[position & self._mask]
+
+    def advance(self) -> Token or None:
+        """
+        Moves past the current token and returns the next one.
+        """
+        self._head += 1
+        if self._head < self._tail:
+            return self._buffer[self._head & self._mask]
+        return self.peek()
+
+    @property
+    def position(self) -> int:
+        """
+        Number of tokens moved past.
+        """
+        return self._head
+
+    def mark(self) -> int:
+        """
+        Pins the current position until `reset` or `release` with the
+        returned mark.
+        """
+        self._marks.append(self._head)
+        return self._head
+
+    def reset(self, mark: int):
+        """
+        Returns to a mark and releases it along with any later marks.
+        """
+        self.release(mark)
+        self._head = mark
+
+    def release(self, mark: int):
+        """
+        Drops a mark, and any later marks, without moving.
+        """
+        index = self._marks.index(mark)
+        del self._marks[index:]
+
+    def _refill(self):
+        oldest = min(self._marks[0], self._head) if self._marks else self._head
+        if self._tail + self._batch - oldest > len(self._buffer):
+            self._grow(oldest)
+
+        tokens = []
+        try:
+            self._done = not self._tokenizer.read_tokens(tokens, self._batch)
+        except SyntaxError as error:
+            self._done = True
+            self._error = error
+        buffer, mask, tail = self._buffer, self._mask, self._tail
+        for token in tokens:
+            buffer[tail & mask] = token
+            tail += 1
+        self._tail = tail
+
+    def _grow(self, oldest: int):
+        size = len(self._buffer)
+        while self._tail + self._batch - oldest > size:
+            size *= 2
+        buffer = [None] * size
+        for position in range(oldest, self._tail):
+            buffer[position & (size - 1)] = self._buffer[position & self._mask]
+        self._buffer = buffer
+        self._mask = size - 1
@@ -0,0 +1,249 @@
+from collections.abc import Mapping
+from enum import Enum, auto
+
+
+class Signal(Enum):
+    SKIP = auto()
+    STOP = auto()
+
+
+SKIP = Signal.SKIP
+STOP = Signal.STOP
+
+# Fields holding child nodes, in source order. A field holds a node, a
+# list of nodes or None.
+CHILD_FIELDS: dict[str, tuple[str, ...]] = {
+    'Program': ('body',),
+    'BlockStatement': ('body',),
+    'EmptyStatement': (),
+    'ExpressionStatement': ('expression',),
+    'VariableStatement': ('declarations',),
+    'VariableDeclaration': ('id', 'init'),
+    'IfStatement': ('test', 'consequent', 'alternate'),
+    'WhileStatement': ('test', 'body'),
+    'DoWhileStatement': ('body', 'test'),
+    'ForStatement': ('init', 'test', 'update', 'body'),
+    'FunctionDeclaration': ('name', 'params', 'body'),
+    'ReturnStatement': ('argument',),
+    'ClassDeclaration': ('id', 'superClass', 'body'),
+    'AssignmentExpression': ('left', 'right'),
+    'BinaryExpression': ('left', 'right'),
+    'LogicalExpression': ('left', 'right'),
+    'UnaryExpression': ('argument',),
+    'MemberExpression': ('object', 'property'),
+    'CallExpression': ('callee', 'arguments'),
+    'NewExpression': ('callee', 'arguments'),
+    'Identifier': (),
+    'ThisExpression': (),
+    'Super': (),
+    'NumericLiteral': (),
+    'StringLiteral': (),
+    'BooleanLiteral': (),
+    'NullLiteral': (),
+}
+
+_REVERSED_FIELDS = {node_type: fields[::-1] for node_type, fields in CHILD_FIELDS.items()}
+
+
+def child_fields(node: Mapping) -> tuple[str, ...]:
+    """
+    Child fields of a node, from the table for the parser's node types
+    and by looking at the values for any other.
+    """
+    fields = CHILD_FIELDS.get(node['type'])
+    if fields is None:
+        fields = tuple(key for key, value in node.items() if _holds_nodes(value))
+    return fields
+
+
+def _is_node(value) -> bool:
+    # Other mappings, like ESTree `loc`, are data.
+    return isinstance(value, Mapping) and 'type' in value
+
+
+def _holds_nodes(value) -> bool:
+    if isinstance(value, (list, tuple)):
+        return any(_is_node(item) for item in value) and all(item is None or _is_node(item) for item in value)
+    return _is_node(value)
+
+
+class Visitor:
+    """
+    Walks an AST depth first in source order, without recursion, so any
+    depth is safe.
+
+    Subclasses define `visit_<Type>(node)`, called before the node's
+    children, and `leave_<Type>(node)`, called after them; node types
+    without a method cost one dict lookup. Either may return STOP to end
+    the walk, and a visit method may return SKIP to pass over the
+    children (the leave method still runs). The methods are looked up
+    once per class and node type.
+
+    Nodes are read as mappings, so the parser's dicts, hash-consed
+    `Node`s and `DeferredBlock`s all work; a shared subtree is visited
+    once per occurrence.
+    """
+
+    _handlers: dict[str, tuple] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._handlers = {}
+
+    @classmethod
+    def _lookup(cls, node_type: str) -> tuple:
+        handlers = cls._handlers[node_type] = (
+            getattr(cls, 'visit_' + node_type, None),
+            getattr(cls, 'leave_' + node_type, None),
+        )
+        return handlers
+
+    def walk(self, root: Mapping) -> bool:
+        """
+        Walks the tree under `root`. Returns False if it was stopped.
+        """
+        handlers = self._handlers
+        lookup = self._lookup
+        reversed_fields = _REVERSED_FIELDS
+        stack = [root]
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+
+        while stack:
+            node = pop()
+            if node.__class__ is tuple:
+                if node[1](self, node[0]) is STOP:
+                    return False
+                continue
+            if node is None:
+                # A gap in a node list.
+                continue
+
+            node_type = node['type']
+            visit, leave = handlers.get(node_type) or lookup(node_type)
+            if visit is not None:
+                signal = visit(self, node)
+                if signal is STOP:
+                    return False
+            else:
+                signal = None
+            if leave is not None:
+                push((node, leave))
+            if signal is SKIP:
+                continue
+
+            fields = reversed_fields.get(node_type)
+            if fields is None:
+                fields = child_fields(node)[::-1]
+            for field in fields:
+                child = node[field]
+                if child is None:
+                    continue
+                if child.__class__ is list or child.__class__ is tuple:
+                    extend(child[::-1])
+                else:
+                    push(child)
+        return True
+
+
+class Transformer(Visitor):
+    """
+    Rebuilds an AST bottom up, without recursion.
+
+    `leave_<Type>(node)` gets the node with its children already
+    transformed and returns its replacement; returning the node keeps
+    it. A node whose children changed is copied into a plain dict (node
+    lists into lists) and everything untouched is shared with the input,
+    which is never modified. `visit_<Type>(node)` may return SKIP to
+    keep the subtree as it is, or STOP to keep the rest of the tree as
+    it is.
+    """
+
+    def transform(self, root: Mapping):
+        """
+        Returns the transformed tree under `root`.
+        """
+        handlers = self._handlers
+        lookup = self._lookup
+        reversed_fields = _REVERSED_FIELDS
+        stack = [root]
+        results = []
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+        stopped = False
+
+        while stack:
+            item = pop()
+            if item.__class__ is tuple:
+                node, fields, leave, base = item
+                if len(results) > base:
+                    node = _rebuild(node, fields, results, base)
+                if leave is not None and not stopped:
+                    replacement = leave(self, node)
+                    if replacement is STOP:
+                        stopped = True
+                    else:
+                        node = replacement
+                results.append(node)
+                continue
+
+            node = item
+            if stopped or node is None:
+                # A gap in a node list stays where it was.
+                results.append(node)
+                continue
+            node_type = node['type']
+            visit, leave = handlers.get(node_type) or lookup(node_type)
+            signal = visit(self, node) if visit is not None else None
+            if signal is STOP:
+                stopped = True
+                results.append(node)
+                continue
+
+            fields = () if signal is SKIP else reversed_fields.get(node_type)
+            if fields is None:
+                fields = child_fields(node)[::-1]
+            if not fields and leave is None:
+                results.append(node)
+                continue
+            push((node, fields, leave, len(results)))
+            for field in fields:
+                child = node[field]
+                if child is None:
+                    continue
+                if child.__class__ is list or child.__class__ is tuple:
+                    extend(child[::-1])
+                else:
+                    push(child)
+        return results[0]
+
+
+def _rebuild(node: Mapping, fields: tuple[str, ...], results: list, base: int) -> Mapping:
+    """
+    Puts the transformed children of `node`, which are `results[base:]`,
+    back into their fields, copying the node only if one changed.
+    """
+    children = results[base:]
+    del results[base:]
+    copy = None
+    index = 0
+    for field in reversed(fields):
+        value = node[field]
+        if value is None:
+            continue
+        if value.__class__ is list or value.__class__ is tuple:
+            items = children[index:index + len(value)]
+            index += len(value)
+            if any(new is not old for new, old in zip(items, value)):
+                if copy is None:
+                    copy = dict(node)
+                copy[field] = items
+        else:
+            if children[index] is not value:
+                if copy is None:
+                    copy = dict(node)
+                copy[field] = children[index]
+            index += 1
+    return node if copy is None else copy
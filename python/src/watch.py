@@ -0,0 +1,341 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import time
+from bisect import bisect_left
+from typing import Iterator, NamedTuple
+from src.parser import Parser
+from src.tokenizer import Token, Tokenizer
+
+# inotify(7) event bits.
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+
+_EVENT = struct.Struct('iIII')
+
+
+class Delta(NamedTuple):
+    """
+    Change to the top-level statements of a file: `removed` statements
+    from index `start` on were replaced by `inserted`.
+    """
+    start: int
+    removed: int
+    inserted: list
+
+
+def _common_prefix(a: str, b: str) -> int:
+    low, high = 0, min(len(a), len(b))
+    # Compare growing chunks first: edits are usually far from the start.
+    step = 4096
+    while low + step <= high and a[low:low + step] == b[low:low + step]:
+        low += step
+        step *= 2
+    high = min(high, low + step)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+class SourceFile:
+    """
+    Text, tokens and top-level statements of one file, updated in place
+    as the text changes.
+
+    An update re-scans from the last token boundary before the edit until
+    the new tokens fall back in step with the old ones past it, and
+    re-parses from the last statement whose tokens and the token after
+    them are untouched until a new statement ends where an old one began
+    past the edit. Everything outside that window is reused, so the work
+    follows the size of the edit; only moving the later tokens' offsets
+    touches the whole file.
+    """
+
+    def __init__(self, engine: str = 'regex', numbers: str = 'int'):
+        self.text: str = ''
+        self.tokens: list[Token] = []
+        self.statements: list = []
+        # Index one past the last token of each statement.
+        self._ends: list[int] = []
+        self._engine: str = engine
+        self._parser: Parser = Parser(engine, numbers=numbers)
+
+    def update(self, text: str) -> Delta:
+        """
+        Brings the file up to date with `text` and returns what changed.
+        If the text does not parse the file is left as it was.
+        """
+        old = self.text
+        prefix = _common_prefix(old, text)
+        suffix = _common_suffix(old, text, min(len(old), len(text)) - prefix)
+        shift = len(text) - len(old)
+
+        # Tokens ending before the edit are unchanged, as is the character
+        # after each of them that ended its match.
+        keep = bisect_left(self.tokens, prefix, key=Token.end.fget)
+        tokenizer = Tokenizer(text, self._engine)
+        tokenizer.seek(self.tokens[keep - 1].end if keep else 0)
+
+        # Scan until a token starts where an old one did in the unchanged
+        # tail; from a common boundary on, the tokens are the same.
+        tail = len(text) - suffix
+        fresh = []
+        resync = None
+        while resync is None:
+            batch = []
+            more = tokenizer.read_tokens(batch, 64)
+            for token in batch:
+                if token.start >= tail:
+                    index = bisect_left(self.tokens, token.start - shift, keep, key=lambda t: t.start)
+                    if index < len(self.tokens) and self.tokens[index].start == token.start - shift:
+                        resync = index
+                        break
+                fresh.append(token)
+            if not more:
+                break
+
+        tokens = self.tokens[:keep] + fresh
+        if resync is not None:
+            if shift:
+                tokens.extend(Token(token.type, token.value, token.start + shift) for token in self.tokens[resync:])
+            else:
+                tokens.extend(self.tokens[resync:])
+        moved = len(tokens) - len(self.tokens)
+
+        # A statement is reused if its tokens and the one after them (an
+        # `if` looks for `else`) come before the edit.
+        first = bisect_left(self._ends, keep)
+        start = self._ends[first - 1] if first else 0
+        old_starts = [0] + self._ends[:-1]
+        inserted = []
+        ends = []
+        reused = len(self.statements)
+        for statement, end in self._parser.statements(tokens, start):
+            inserted.append(statement)
+            ends.append(end)
+            if resync is not None and end >= keep + len(fresh):
+                index = bisect_left(old_starts, end - moved)
+                if index < len(old_starts) and old_starts[index] == end - moved and index >= first:
+                    reused = index
+                    break
+
+        self.text = text
+        self.tokens = tokens
+        self.statements[first:reused] = inserted
+        self._ends[first:] = ends + [end + moved for end in self._ends[reused:]]
+        return Delta(first, reused - first, inserted)
+
+
+class _Inotify:
+    """
+    Directory watches through inotify(7), called by ctypes.
+    """
+
+    mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd: int = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._directories: dict[int, str] = {}
+
+    def close(self):
+        os.close(self._fd)
+
+    def add(self, directory: str):
+        watch = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.mask)
+        if watch < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch failed: {directory}')
+        self._directories[watch] = directory
+
+    def read(self, timeout: float) -> list[tuple[str, int]] or None:
+        """
+        Paths and event bits of what happened within `timeout` seconds,
+        None if events were lost and everything must be rescanned.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self._fd, 1 << 16)
+        events = []
+        offset = 0
+        while offset < len(data):
+            watch, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self._directories.pop(watch, None)
+                continue
+            directory = self._directories.get(watch)
+            if directory is not None:
+                events.append((os.path.join(directory, os.fsdecode(name)) if name else directory, mask))
+        return events
+
+
+class Watcher:
+    """
+    Keeps the files under a directory that match `pattern` parsed, and
+    reports how their top-level statements change.
+
+    Changes are noticed with inotify where there is one and by polling
+    modification times every `interval` seconds otherwise (or with
+    `poll`, or once a directory cannot be watched). Each event is a dict
+    naming the 'file' and holding either the `Delta` fields ('start',
+    'removed', 'inserted'), an 'error' for a file that stopped parsing
+    (its last good state is kept) or 'deleted'. Files are parsed with
+    `engine` and `numbers` as by `Parser`.
+    """
+
+    def __init__(self, root: str, pattern: str = '*.lt', engine: str = 'regex', interval: float = 0.5,
+                 poll: bool = False, numbers: str = 'int'):
+        self.root: str = root
+        self.pattern: str = pattern
+        self.files: dict[str, SourceFile] = {}
+        self._engine: str = engine
+        self._numbers: str = numbers
+        self._interval: float = interval
+        self._stats: dict[str, tuple[int, int]] = {}
+        self._inotify: _Inotify or None = None
+        if not poll:
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError):
+                self._inotify = None
+        self._pending: set[str] = set(self._scan())
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+
+    def events(self) -> Iterator[dict]:
+        """
+        Events for every file at first, then for each change, forever.
+        """
+        while True:
+            yield from self.changes()
+
+    def changes(self, timeout: float or None = None) -> list[dict]:
+        """
+        Events for the changes seen within `timeout` seconds (the poll
+        interval by default).
+        """
+        timeout = self._interval if timeout is None else timeout
+        paths, self._pending = self._pending, set()
+        if not paths:
+            if self._inotify is not None:
+                paths = self._notified(timeout)
+            else:
+                time.sleep(timeout)
+                paths = self._scan()
+        return [event for event in map(self._update, sorted(paths)) if event is not None]
+
+    def _matches(self, path: str) -> bool:
+        return fnmatch.fnmatch(os.path.basename(path), self.pattern)
+
+    def _scan(self) -> set[str]:
+        """
+        Walks the tree, watching every directory, and returns the files
+        that are new, changed or gone since the last walk.
+        """
+        stats = {}
+        for directory, _, names in os.walk(self.root):
+            self._watch(directory)
+            for name in names:
+                path = os.path.join(directory, name)
+                if self._matches(path):
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    stats[path] = (stat.st_mtime_ns, stat.st_size)
+        changed = {path for path, stat in stats.items() if self._stats.get(path) != stat}
+        changed.update(path for path in self._stats if path not in stats)
+        self._stats = stats
+        return changed
+
+    def _watch(self, directory: str):
+        """
+        Adds an inotify watch on a directory. When that fails, for one when
+        fs.inotify.max_user_watches is reached, inotify is given up for
+        polling.
+        """
+        if self._inotify is None:
+            return
+        try:
+            self._inotify.add(directory)
+        except OSError:
+            self._inotify.close()
+            self._inotify = None
+
+    def _notified(self, timeout: float) -> set[str]:
+        events = self._inotify.read(timeout)
+        if events is None:
+            return self._scan()
+        paths = set()
+        for path, mask in events:
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    for directory, _, names in os.walk(path):
+                        self._watch(directory)
+                        paths.update(os.path.join(directory, name) for name in names)
+                elif mask & (IN_DELETE | IN_MOVED_FROM | IN_DELETE_SELF):
+                    paths.update(file for file in self.files if file.startswith(path + os.sep))
+            else:
+                paths.add(path)
+        paths = {path for path in paths if self._matches(path)}
+        if self._inotify is None:
+            # Watches failed: what changed meanwhile is only found by a scan.
+            paths |= self._scan()
+        return paths
+
+    def _update(self, path: str) -> dict or None:
+        try:
+            with open(path) as file:
+                text = file.read()
+        except (FileNotFoundError, NotADirectoryError):
+            if self.files.pop(path, None) is None:
+                return None
+            return {'file': path, 'deleted': True}
+
+        source = self.files.get(path)
+        if source is None:
+            source = SourceFile(self._engine, self._numbers)
+        elif source.text == text:
+            return None
+        try:
+            delta = source.update(text)
+        except Exception as error:
+            # Malformed input can also end the parser with other errors.
+            return {'file': path, 'error': f'{type(error).__name__}: {error}'}
+        self.files[path] = source
+        return {'file': path, **delta._asdict()}
@@ -0,0 +1,67 @@
+import json
+import unittest
+from parameterized import parameterized
+from src.deferred import DeferredBlock
+from src.parser import Parser
+from src.tokenizer import Tokenizer
+from tests_tokenizer import inputs
+
+
+class DeferredBlockTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.parser = Parser(lazy=True)
+
+    @parameterized.expand(inputs())
+    def test_matches_eager_parse(self, name, string):
+        self.assertEqual(Parser().parse(string), self.parser.parse(string))
+
+    @parameterized.expand(inputs())
+    def test_json_export(self, name, string):
+        self.assertEqual(json.dumps(Parser().parse(string)), json.dumps(self.parser.parse(string)))
+
+    def test_bodies_deferred(self):
+        source = 'class A { def f() { g(); } } def h(x) { return x; }'
+        ast = self.parser.parse(source)
+        blocks = [statement['body'] for statement in ast['body']]
+        self.assertTrue(all(isinstance(block, DeferredBlock) and not block.parsed for block in blocks))
+        self.assertEqual(['{ def f() { g(); } }', '{ return x; }'], [source[slice(*block.span)] for block in blocks])
+        self.assertEqual('A', ast['body'][0]['id']['name'])
+
+        method = blocks[0]['body'][0]
+        self.assertTrue(blocks[0].parsed)
+        self.assertFalse(method['body'].parsed)
+        self.assertEqual('{ g(); }', source[slice(*method['body'].span)])
+
+    def test_nested_bodies(self):
+        source = 'class A { def f() { def g() { return 1; } return g(); } } def h() { def k() { x; } }'
+        ast = self.parser.parse(source)
+        tokens = []
+        Tokenizer(source).read_tokens(tokens, len(source))
+        spans = [statement['body'].span for statement in ast['body']]
+        # The tokens of bodies within bodies are only kept once.
+        self.assertEqual(sum(start <= token.start < end for token in tokens for start, end in spans),
+                         len(self.parser._bodies._skipped))
+        self.assertEqual('x', ast['body'][1]['body']['body'][0]['body']['body'][0]['expression']['name'])
+        self.assertEqual(Parser().parse(source), ast)
+
+    def test_errors_on_first_read(self):
+        ast = self.parser.parse('def f() { let = ; } x;')
+        body = ast['body'][0]['body']
+        for _ in range(2):
+            with self.assertRaises(SyntaxError):
+                body['body']
+        self.assertFalse(body.parsed)
+
+    def test_unbalanced_braces(self):
+        with self.assertRaises(SyntaxError):
+            self.parser.parse('def f() { { }')
+
+    def test_shares_symbols(self):
+        ast = self.parser.parse('def f(x) { return x; }')
+        ast['body'][0]['body']['body']
+        self.assertEqual({'f': 1, 'x': 2}, self.parser.symbols.identifiers)
+
+    def test_not_with_hash_cons(self):
+        with self.assertRaises(ValueError):
+            Parser(hash_cons=True, lazy=True)
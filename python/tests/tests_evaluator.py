@@ -0,0 +1,91 @@
+import os
+import unittest
+from src.evaluator import evaluate, Instance
+from src.parser import Parser
+
+
+def run(source: str, globals: dict or None = None) -> dict:
+    return evaluate(Parser().parse(source), globals)
+
+
+class EvaluatorTests(unittest.TestCase):
+
+    def test_arithmetic(self):
+        result = run('let x = 2 * 3 + 4, y = -x, z = (x - 4) / 4; x += 1; x *= 2;')
+        self.assertEqual({'x': 22, 'y': -10, 'z': 1.5}, result)
+
+    def test_logical(self):
+        result = run('let a = 0 || "b", b = 1 && 2, c = !a, d = null && f();')
+        self.assertEqual({'a': 'b', 'b': 2, 'c': False, 'd': None}, result)
+
+    def test_loops(self):
+        result = run('''
+            let total = 0, i = 10, j = 0;
+            for (let k = 0; k < 5; k += 1) { total += k; }
+            while (i > 0) { i -= 3; }
+            do { j += 1; } while (j < 0);
+        ''')
+        self.assertEqual({'total': 10, 'i': -2, 'j': 1}, result)
+
+    def test_recursion(self):
+        result = run('''
+            def fib(n) { if (n < 2) { return n; } return fib(n - 1) + fib(n - 2); }
+            let x = fib(15);
+        ''')
+        self.assertEqual(610, result['x'])
+
+    def test_closures(self):
+        result = run('''
+            def counter() {
+                let count = 0;
+                def next() { count += 1; return count; }
+                return next;
+            }
+            let first = counter(), second = counter();
+            first(); first();
+            let a = first(), b = second();
+        ''')
+        self.assertEqual((3, 1), (result['a'], result['b']))
+
+    def test_block_scope(self):
+        result = run('let x = 1; { let x = 2; y = x; } let z = x;', {})
+        self.assertEqual(1, result['z'])
+
+    def test_classes(self):
+        result = run('''
+            class Point {
+                def constructor(x, y) { this.x = x; this.y = y; }
+                def sum() { return this.x + this.y; }
+            }
+            class Point3D extends Point {
+                def constructor(x, y, z) { super(x, y); this.z = z; }
+                def sum() { return this.x + this.y + this.z; }
+            }
+            let p = new Point3D(1, 2, 3), q = new Point(1, 2);
+            let s = p.sum() + q.sum(), key = "z";
+            p[key] += 1;
+            let z = p.z;
+        ''')
+        self.assertIsInstance(result['p'], Instance)
+        self.assertEqual(9, result['s'])
+        self.assertEqual(4, result['z'])
+
+    def test_strings(self):
+        with open(os.path.join(os.path.dirname(__file__), '..', 'sample.lt')) as file:
+            source = file.read().replace('s[i];', 'last = s[i];')
+        result = run(source, {})
+        self.assertEqual(12, result['i'])
+
+    def test_globals(self):
+        printed = []
+        run('print(1, "a"); x = 2;', globals := {'print': lambda *args: printed.append(args)})
+        self.assertEqual([(1, 'a')], printed)
+        self.assertEqual(2, globals['x'])
+
+    def test_errors(self):
+        with self.assertRaises(NameError):
+            run('missing;')
+        with self.assertRaises(TypeError):
+            run('let x = 1; x();')
+        with self.assertRaises(TypeError):
+            run('class A {} A();')
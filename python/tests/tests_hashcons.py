@@ -0,0 +1,46 @@
+import unittest
+import yaml
+from parameterized import parameterized
+from src.parser import Parser
+from tests_tokenizer import inputs
+
+
+class HashConsTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.parser = Parser(hash_cons=True)
+
+    @parameterized.expand(inputs())
+    def test_export_unchanged(self, name, string):
+        self.assertEqual(Parser().parse(string), self.parser.parse(string).to_dict())
+
+    def test_identical_subtrees_shared(self):
+        ast = self.parser.parse('this.a.b + 1; f(this.a.b + 1); this.a.c;')
+        first = ast['body'][0]['expression']
+        second = ast['body'][1]['expression']['arguments'][0]
+        third = ast['body'][2]['expression']
+        self.assertIs(first, second)
+        self.assertIs(first['left']['object'], third['object'])
+        self.assertEqual(first.hash, second.hash)
+
+    def test_distinct_subtrees(self):
+        ast = self.parser.parse('1; true; "1"; x.y; x[y];')
+        nodes = [statement['expression'] for statement in ast['body']]
+        self.assertEqual(len(nodes), len({node.id for node in nodes}))
+        self.assertNotEqual(nodes[3], nodes[4])
+
+    def test_structural_hash_across_parses(self):
+        first = self.parser.parse('a + b * 2;')
+        second = Parser(hash_cons=True).parse('let z; a + b * 2;')
+        self.assertEqual(first['body'][0].hash, second['body'][1].hash)
+        self.assertEqual(first['body'][0], second['body'][1])
+
+    def test_immutable(self):
+        ast = self.parser.parse('x;')
+        with self.assertRaises(TypeError):
+            ast['body'] = []
+
+    def test_export_is_plain(self):
+        exported = self.parser.parse('x; x;').to_dict()
+        self.assertIsNot(exported['body'][0], exported['body'][1])
+        self.assertNotIn('&id', yaml.dump(exported))
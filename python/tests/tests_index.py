@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from src.index import Index, IndexBuilder, CALL
+from src.parser import Parser
+
+documents = {
+    'shapes': '''
+        class Shape { def area() { return 0; } }
+        class Square extends Shape {
+            def constructor(side) { this.side = side; }
+            def area() { return this.side * this.side; }
+        }
+        let s = new Square(2); print(s.area());
+    ''',
+    'main': 'def main() { let c = new Circle(1); c.radius = 2; print(c.area()); print(1); }',
+    'circle': 'class Circle extends Shape { def constructor(r) { this.radius = r; super(); } }',
+}
+
+
+class IndexTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'ast.index')
+        builder = IndexBuilder()
+        for name, source in documents.items():
+            builder.add(name, Parser(lazy=True).parse(source))
+        builder.write(cls.path)
+        cls.index = Index(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.index.close()
+        cls.directory.cleanup()
+
+    def test_queries(self):
+        self.assertEqual(3, len(self.index))
+        self.assertEqual([('shapes', 1), ('main', 2)], self.index.calls('print'))
+        self.assertEqual([('shapes', 1), ('main', 1)], self.index.calls('area'))
+        self.assertEqual([('circle', 1)], self.index.calls('super'))
+        self.assertEqual([('shapes', 1), ('circle', 1)], self.index.subclasses('Shape'))
+        self.assertEqual([('main', 1)], self.index.instantiations('Circle'))
+        self.assertEqual([('shapes', 1)], self.index.classes('Square'))
+        self.assertEqual([('shapes', 2)], self.index.functions('area'))
+        self.assertEqual([('main', 1)], self.index.assignments('radius'))
+        self.assertEqual([('circle', 1)], self.index.assignments('this.radius'))
+        self.assertEqual([('shapes', 1)], self.index.assignments('this.side'))
+        self.assertEqual([], self.index.assignments('side'))
+
+    def test_missing(self):
+        self.assertEqual([], self.index.calls('missing'))
+        self.assertEqual([], self.index.subclasses('Circle'))
+        self.assertEqual([], self.index.lookup('unknown', 'print'))
+
+    def test_names(self):
+        self.assertEqual(['area', 'print', 'super'], self.index.names(CALL))
+
+    def test_not_an_index(self):
+        path = os.path.join(self.directory.name, 'other')
+        with open(path, 'wb') as file:
+            file.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            Index(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
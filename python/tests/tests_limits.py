@@ -0,0 +1,81 @@
+import unittest
+from parameterized import parameterized
+from src.parser import LimitExceeded, Parser
+
+source = 'let x = 1 + 2;\nif (x) { x = -x; }\n'
+
+
+class LimitTests(unittest.TestCase):
+
+    def test_within_limits(self):
+        parser = Parser()
+        expected = parser.parse(source)
+        self.assertEqual(expected, parser.parse(source, max_input_size=len(source), max_tokens=18, max_nodes=15,
+                                                max_depth=6))
+
+    @parameterized.expand([
+        ['max_input_size', len(source) - 1, 'Input is longer than'],
+        ['max_tokens', 17, 'Input has more than'],
+        ['max_nodes', 14, 'AST has more than'],
+        ['max_depth', 5, 'Input nests deeper than'],
+    ])
+    def test_exceeded(self, limit, maximum, message):
+        with self.assertRaises(LimitExceeded) as context:
+            Parser().parse(source, **{limit: maximum})
+        self.assertEqual(limit, context.exception.limit)
+        self.assertEqual(maximum, context.exception.maximum)
+        self.assertEqual(f'{message} {maximum}', str(context.exception).rsplit(' ', 1)[0])
+
+    @parameterized.expand([
+        ['blocks', '{' * 30 + '}' * 30],
+        ['parentheses', '(' * 30 + '1' + ')' * 30 + ';'],
+        ['unary', '-' * 30 + '1;'],
+        ['assignments', 'a = ' * 30 + '1;'],
+        ['new', 'new ' * 30 + 'a' + '()' * 30 + ';'],
+    ])
+    def test_depth(self, name, text):
+        Parser().parse(text, max_depth=32)
+        with self.assertRaises(LimitExceeded):
+            Parser().parse(text, max_depth=29)
+
+    def test_recursion_limit(self):
+        call = Parser().parse('f' + '()' * 5000 + ';', max_depth=100)['body'][0]['expression']
+        calls = 0
+        while call['type'] == 'CallExpression':
+            call, calls = call['callee'], calls + 1
+        self.assertEqual(5000, calls)
+        for text in ('new ' * 3000 + 'a' + '()' * 3000 + ';', '(' * 3000 + '1' + ')' * 3000 + ';'):
+            with self.assertRaises(LimitExceeded) as raised:
+                Parser().parse(text, max_depth=100)
+            self.assertLess(raised.exception.maximum, 100)
+
+    def test_fails_fast(self):
+        parser = Parser()
+        with self.assertRaises(LimitExceeded):
+            parser.parse('f(1);' * 100000, max_tokens=1000)
+        self.assertLessEqual(parser._tokens.position, 1001)
+
+    def test_limits_reset(self):
+        parser = Parser()
+        with self.assertRaises(LimitExceeded):
+            parser.parse(source, max_nodes=1)
+        self.assertEqual(Parser().parse(source), parser.parse(source))
+
+    def test_deferred_bodies(self):
+        ast = Parser(lazy=True).parse('def f() { return 1 + 2 + 3; }', max_nodes=5)
+        with self.assertRaises(LimitExceeded):
+            ast['body'][0]['body']['body']
+        with self.assertRaises(LimitExceeded):
+            Parser(lazy=True).parse('def f() {' + 'x;' * 10000 + '}', max_tokens=100)
+        ast = Parser(lazy=True).parse('def f() { x; } ' * 10, max_nodes=40)
+        with self.assertRaises(LimitExceeded):
+            for statement in ast['body']:
+                statement['body']['body']
+        ast = Parser(lazy=True).parse('def f() {' * 50 + '}' * 50, max_depth=10)
+        with self.assertRaises(LimitExceeded):
+            while True:
+                ast = ast['body'][0]['body']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import io
+import json
+import unittest
+from argparse import Namespace
+from unittest import mock
+from main import batch, profile_memory
+from src.parser import LimitExceeded, Parser
+from src.tokenizer import Tokenizer
+
+
+class BatchTests(unittest.TestCase):
+
+    def run_batch(self, lines: list, fold_constants: bool = False, limits: dict or None = None) -> list:
+        results = io.StringIO()
+        batch(Parser(), fold_constants, io.StringIO('\n'.join(lines) + '\n'), results, limits)
+        return [json.loads(line) for line in results.getvalue().splitlines()]
+
+    def test_results(self):
+        results = self.run_batch([
+            json.dumps({'id': 1, 'source': '42;'}),
+            '',
+            json.dumps({'id': 'two', 'source': 'let x = 1 + 2;'}),
+        ], fold_constants=True)
+        self.assertEqual([1, 'two'], [result['id'] for result in results])
+        self.assertEqual(Parser().parse('42;'), results[0]['ast'])
+        self.assertEqual(Parser().parse('let x = 3;'), results[1]['ast'])
+        self.assertTrue(all(result['time'] >= 0 for result in results))
+
+    def test_errors(self):
+        results = self.run_batch([
+            json.dumps({'id': 1, 'source': 'let'}),
+            'not json',
+            json.dumps({'id': 3}),
+            json.dumps({'id': 4, 'source': '1;'}),
+        ])
+        self.assertEqual([1, None, 3, 4], [result['id'] for result in results])
+        self.assertEqual(['SyntaxError', 'JSONDecodeError', 'KeyError'],
+                         [result['error'].split(':')[0] for result in results[:3]])
+        self.assertIn('ast', results[3])
+
+    def test_limits(self):
+        results = self.run_batch([
+            json.dumps({'id': 1, 'source': '1;' * 100}),
+            json.dumps({'id': 2, 'source': '1;'}),
+        ], limits={'max_tokens': 10})
+        self.assertEqual('LimitExceeded: Input has more than 10 tokens', results[0]['error'])
+        self.assertIn('ast', results[1])
+
+
+class MemoryProfileTests(unittest.TestCase):
+
+    def test_limits(self):
+        args = Namespace(engine='regex', fold=False, format='json')
+        with self.assertRaises(LimitExceeded):
+            profile_memory(Parser(), '1;' * 100, {'max_input_size': 10}, args)
+        with mock.patch.object(Tokenizer, 'read_tokens', autospec=True, side_effect=Tokenizer.read_tokens) as read:
+            with self.assertRaises(LimitExceeded):
+                profile_memory(Parser(), '1;' * 100, {'max_tokens': 10}, args)
+        self.assertEqual(11, read.call_args.args[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import tracemalloc
+import unittest
+from src.memory import MemoryProfile
+from src.parser import Parser
+
+source = 'let items = "abc";\nf(items, 42);\n' * 200
+
+
+class MemoryProfileTests(unittest.TestCase):
+
+    def test_phases(self):
+        profile = MemoryProfile()
+        with profile.phase('build'):
+            kept = [str(i) * 10 for i in range(10000)]
+            temporary = [bytes(1000) for _ in range(1000)]
+            del temporary
+        self.assertFalse(tracemalloc.is_tracing())
+        [phase] = profile.phases
+        self.assertEqual('build', phase.name)
+        self.assertGreater(phase.peak, 1000 * 1000)
+        self.assertGreater(phase.peak, phase.retained)
+        self.assertGreater(phase.retained, len(kept) * 10)
+        self.assertEqual({}, profile.productions['build'])
+
+    def test_productions(self):
+        profile = MemoryProfile()
+        parser = Parser()
+        with profile.phase('parse'):
+            ast = parser.parse(source)
+        productions = profile.productions['parse']
+        for name in ('program', 'variable_declaration', 'string_literal', 'numeric_literal', 'argument_list'):
+            self.assertIn(name, productions)
+        self.assertFalse(any(name.startswith('_') for name in productions))
+        self.assertIn('parse', profile.report())
+        self.assertEqual(400, len(ast['body']))
+
+    def test_peak_only(self):
+        profile = MemoryProfile()
+        with profile.phase('dump', productions=False):
+            text = repr(list(range(10000)))
+        self.assertGreater(profile.phases[0].retained, len(text))
+        self.assertNotIn('dump', profile.productions)
+
+
+if __name__ == '__main__':
+    unittest.main()
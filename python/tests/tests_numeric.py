@@ -0,0 +1,77 @@
+import sys
+import unittest
+from parameterized import parameterized
+from src.evaluator import evaluate
+from src.numeric import NumericValue, integer, to_int
+from src.optimizer import fold
+from src.parser import Parser
+
+huge = '9' * 50000
+
+
+class NumericTests(unittest.TestCase):
+
+    @parameterized.expand([('0',), ('42',), ('007',), ('1' * 999,), ('1' * 1001,), ('1234567890' * 3000,)])
+    def test_to_int(self, digits):
+        with_limit = sys.get_int_max_str_digits()
+        sys.set_int_max_str_digits(0)
+        try:
+            self.assertEqual(int(digits), to_int(digits))
+        finally:
+            sys.set_int_max_str_digits(with_limit)
+
+    def test_modes(self):
+        self.assertEqual(42, Parser().parse('42;')['body'][0]['expression']['value'])
+        value = Parser(numbers='lazy').parse('42;')['body'][0]['expression']['value']
+        self.assertIsInstance(value, NumericValue)
+        self.assertEqual('42', value.raw)
+        self.assertEqual(42, value)
+        self.assertEqual('007', Parser(numbers='raw').parse('007;')['body'][0]['expression']['value'])
+        with self.assertRaises(ValueError):
+            Parser(numbers='float')
+
+    def test_lazy_conversion(self):
+        value = NumericValue('123')
+        self.assertIsNone(value._value)
+        self.assertEqual(123, int(value))
+        self.assertEqual(123, value._value)
+        self.assertEqual(hash(123), hash(value))
+        self.assertEqual(NumericValue('0123'), value)
+        self.assertEqual([1, 2, 3][NumericValue('1')], 2)
+
+    def test_hash_converts_nothing(self):
+        for digits in ('0', '0042', '9' * 18, '1' * 19, '0' * 30 + '7', huge):
+            value = NumericValue(digits)
+            with_limit = sys.get_int_max_str_digits()
+            sys.set_int_max_str_digits(0)
+            try:
+                self.assertEqual(hash(int(digits)), hash(value))
+            finally:
+                sys.set_int_max_str_digits(with_limit)
+            self.assertIsNone(value._value)
+
+    def test_huge(self):
+        expected = to_int(huge)
+        for numbers in ('int', 'lazy', 'raw'):
+            value = Parser(numbers=numbers).parse(f'{huge};')['body'][0]['expression']['value']
+            self.assertEqual(expected, integer(value))
+
+    def test_lazy_blocks(self):
+        ast = Parser(lazy=True, numbers='raw').parse('def f() { return 10; }')
+        self.assertEqual('10', ast['body'][0]['body']['body'][0]['argument']['value'])
+
+    def test_consumers(self):
+        for numbers in ('lazy', 'raw'):
+            parser = Parser(numbers=numbers)
+            self.assertEqual({'x': 7}, evaluate(parser.parse('let x = 3 + 4;')))
+            self.assertEqual(Parser().parse('7;'), fold(parser.parse('3 + 4;')))
+
+    def test_hash_cons(self):
+        ast = Parser(hash_cons=True, numbers='lazy').parse('42; 42; 43;')
+        self.assertIs(ast['body'][0], ast['body'][1])
+        self.assertIsNone(ast['body'][2]['expression']['value']._value)
+        self.assertEqual(Parser().parse('42; 42; 43;'), ast.to_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
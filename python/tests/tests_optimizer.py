@@ -0,0 +1,80 @@
+import unittest
+from parameterized import parameterized
+from src.evaluator import evaluate
+from src.optimizer import fold
+from src.parser import Parser
+
+
+def parse(source: str) -> dict:
+    return Parser().parse(source)
+
+
+class OptimizerTests(unittest.TestCase):
+
+    @parameterized.expand([
+        ('2 * 3 + 4;', '10;'),
+        ('1 - 5;', '-4;'),
+        ('-(-3);', '3;'),
+        ('(1 + 2) * x;', '3 * x;'),
+        ('"a" + "b";', '"ab";'),
+        ('2 < 3;', 'true;'),
+        ('"b" >= "a";', 'true;'),
+        ('null == null;', 'true;'),
+        ('!true;', 'false;'),
+        ('!"";', 'true;'),
+        ('true && x;', 'x;'),
+        ('0 && x;', '0;'),
+        ('0 || x;', 'x;'),
+        ('"a" || x;', '"a";'),
+        ('if (1 < 2) { a; } else { b; }', '{ a; }'),
+        ('if (false) { a; } else b;', 'b;'),
+        ('if (!1) a;', ';'),
+        ('while (x) { if (2 == 2) { y; } }', 'while (x) { { y; } }'),
+    ])
+    def test_fold(self, source, expected):
+        self.assertEqual(parse(expected), fold(parse(source)))
+
+    @parameterized.expand([
+        ('x + 1 + 2;',),
+        ('1 / 0;',),
+        ('4 / 2;',),
+        ('"a" + 1;',),
+        ('1 == true;',),
+        ('true < false;',),
+        ('-"a";',),
+        ('x && true;',),
+        ('if (false) let x = 1;',),
+        ('if (true) a; else def f() {}',),
+    ])
+    def test_unchanged(self, source):
+        ast = parse(source)
+        self.assertIs(ast, fold(ast))
+
+    def test_input_untouched(self):
+        ast = parse('let x = 1 + 2, y = z;')
+        folded = fold(ast)
+        self.assertEqual(parse('let x = 1 + 2, y = z;'), ast)
+        self.assertIs(ast['body'][0]['declarations'][1], folded['body'][0]['declarations'][1])
+
+    def test_spans(self):
+        ast = parse('1 + 2;')
+        expression = ast['body'][0]['expression']
+        expression.update(start=0, end=5)
+        folded = fold(ast)['body'][0]['expression']
+        self.assertEqual({'type': 'NumericLiteral', 'value': 3, 'start': 0, 'end': 5}, folded)
+
+    def test_nodes(self):
+        ast = Parser(hash_cons=True).parse('let x = 2 * 3, y = 2 * 3;')
+        self.assertEqual(parse('let x = 6, y = 6;'), fold(ast))
+
+    def test_semantics(self):
+        source = '''
+            let a = 2 * 3 + 4 - 20, b = "x" + "y", c = !(1 < 2) || a, d = 0 && b;
+            if (1 == 1) { a += 1; } else { a -= 1; }
+            if (null) { b = 1; }
+        '''
+        self.assertEqual(evaluate(parse(source)), evaluate(fold(parse(source))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,84 @@
+"""
+YAML fixture tests: every fixture's input must parse to its output.
+
+Under unittest the fixtures run with the default engine. Run as a script
+to spread them over worker processes and compare engines:
+
+    python tests_runner.py [--workers N] [--engines regex dfa numpy]
+
+which reports, per engine, the fixtures that fail, the ones whose AST
+differs from the first engine's, and the time spent parsing.
+"""
+import glob
+import hashlib
 import os
+import pickle
 import sys
+import time
 import unittest
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
 import yaml
-import glob
 from parameterized import parameterized
+
+directory = os.path.dirname(os.path.abspath(__file__))
+if __name__ in ('__main__', '__mp_main__'):
+    sys.path.insert(0, os.path.dirname(directory))
+
 from src.parser import Parser
+from src.tokenizer import Tokenizer
+
+cache_directory = os.path.join(directory, '.fixtures')
+
+# libyaml's loader when PyYAML was built with it.
+Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def load(file: str) -> list:
+    """
+    The fixtures of a YAML file, from a pickle cache that is trusted while
+    the file's mtime and size are unchanged and rechecked by hash when
+    they are not.
+    """
+    stat = os.stat(file)
+    cache = os.path.join(cache_directory, os.path.basename(file) + '.pickle')
+    entry = None
+    try:
+        with open(cache, 'rb') as stream:
+            entry = pickle.load(stream)
+        if (entry['mtime'], entry['size']) == (stat.st_mtime_ns, stat.st_size):
+            return entry['fixtures']
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError):
+        entry = None
+
+    with open(file, 'rb') as stream:
+        content = stream.read()
+    digest = hashlib.sha256(content).hexdigest()
+    if entry is not None and entry['hash'] == digest:
+        fixtures = entry['fixtures']
+    else:
+        fixtures = yaml.load(content, Loader=Loader)
+
+    os.makedirs(cache_directory, exist_ok=True)
+    temporary = f'{cache}.{os.getpid()}'
+    with open(temporary, 'wb') as stream:
+        pickle.dump({'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'hash': digest, 'fixtures': fixtures},
+                    stream, pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, cache)
+    return fixtures
+
+
+def fixtures() -> list:
+    """
+    (file, fixture) pairs of all YAML files, in file name order.
+    """
+    return [(os.path.basename(file), fixture)
+            for file in sorted(glob.glob(os.path.join(directory, '*.yaml')))
+            for fixture in load(file)]
 
 
 def init() -> list:
-    tests = []
-    files = glob.glob('*.yaml')
-    files.sort(key=os.path.getctime)
-    for file in files:
-        with open(file, "r") as stream:
-            contents = yaml.safe_load(stream)
-            tests.extend(list(map(lambda x: [f"{file:50s}︎︎ {x['name']}", x['input'], x['output']], contents)))
-    return tests
+    return [[f"{file:50s}︎︎ {x['name']}", x['input'], x['output']] for file, x in fixtures()]
 
 
 class RunnerTests(unittest.TestCase):
@@ -36,3 +99,79 @@ class RunnerTests(unittest.TestCase):
             raise ex
 
 
+def warm(engines: list):
+    """
+    Worker initializer: builds what each engine builds on first use (the
+    DFA, for one) so that it is not counted as parse time. An engine that
+    fails here fails the run.
+    """
+    for engine in engines:
+        Parser(engine).parse('let x = f(1) + "s"; // c')
+
+
+def run(engine: str, tests: list) -> tuple[list, float]:
+    """
+    Parses a batch of fixtures with one engine in a worker. Returns each
+    fixture's AST (or error message) and the time spent parsing.
+    """
+    parser = Parser(engine)
+    results = []
+    elapsed = 0.0
+    for name, inp, expected in tests:
+        start = time.perf_counter()
+        try:
+            output = parser.parse(inp)
+        except Exception as ex:
+            output = f'{type(ex).__name__}: {ex}'
+        elapsed += time.perf_counter() - start
+        results.append(output)
+    return results, elapsed
+
+
+def main():
+    p = ArgumentParser(description='Run the YAML fixtures in parallel, per engine.')
+    p.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes')
+    p.add_argument('--engines', nargs='+', default=list(Tokenizer.engines), choices=Tokenizer.engines,
+                   help='engines to run; the first is the reference for differences')
+    args = p.parse_args()
+
+    engines = []
+    for engine in args.engines:
+        try:
+            Tokenizer('', engine)
+        except ImportError as ex:
+            print(f'{engine:6s} skipped: {ex}', file=sys.stderr)
+            continue
+        engines.append(engine)
+
+    tests = init()
+    size = max(1, len(tests) // (args.workers * 4))
+    batches = [tests[i:i + size] for i in range(0, len(tests), size)]
+    reference = None
+    failed = False
+    with ProcessPoolExecutor(args.workers, initializer=warm, initargs=(engines,)) as pool:
+        for engine in engines:
+            start = time.perf_counter()
+            outputs = []
+            elapsed = 0.0
+            for results, seconds in pool.map(run, [engine] * len(batches), batches):
+                outputs.extend(results)
+                elapsed += seconds
+            wall = time.perf_counter() - start
+
+            failures = [name for (name, _, expected), output in zip(tests, outputs) if output != expected]
+            differences = [] if reference is None else \
+                [name for (name, _, _), output, other in zip(tests, outputs, reference) if output != other]
+            reference = reference or outputs
+            failed = failed or bool(failures or differences)
+            print(f'{engine:6s} {len(tests) - len(failures)}/{len(tests)} passed, {len(differences)} differ from '
+                  f'{engines[0]}, parse {elapsed * 1e3:8.1f} ms, wall {wall * 1e3:8.1f} ms')
+            for name in failures:
+                print(f'  failed  {name}')
+            for name in differences:
+                print(f'  differs {name}')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
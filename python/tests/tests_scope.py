@@ -0,0 +1,98 @@
+import unittest
+from src.parser import Parser
+from src.scope import resolve, GLOBAL, PROPERTY, PROGRAM, FUNCTION, BLOCK, VARIABLE, PARAMETER, FUNCTION_NAME, \
+    CLASS_NAME
+
+
+def bindings(resolution) -> list:
+    """
+    Each identifier in source order as name@binding, with '*' for globals
+    and '.' for properties.
+    """
+    names = []
+    for binding in resolution.identifiers:
+        if binding == GLOBAL:
+            names.append('*')
+        elif binding == PROPERTY:
+            names.append('.')
+        else:
+            names.append(f'{resolution.names[binding]}@{binding}')
+    return names
+
+
+class ScopeTests(unittest.TestCase):
+
+    def test_resolution(self):
+        resolution = resolve(Parser().parse('''
+            let x = 1;
+            def f(a) { let x = a; return x + y + g(); }
+            def g() { return x; }
+            { let x = 2; x; }
+            x;
+        '''))
+        self.assertEqual(['x@0', 'f@1', 'a@3', 'x@4', 'a@3', 'x@4', '*', 'g@2', 'g@2', 'x@0', 'x@5', 'x@5', 'x@0'],
+                         bindings(resolution))
+        self.assertEqual(['x', 'f', 'g', 'a', 'x', 'x'], resolution.names)
+        self.assertEqual([VARIABLE, FUNCTION_NAME, FUNCTION_NAME, PARAMETER, VARIABLE, VARIABLE],
+                         list(resolution.binding_kinds))
+        self.assertEqual([0, 0, 0, 1, 2, 5], list(resolution.scopes))
+        self.assertEqual([PROGRAM, FUNCTION, BLOCK, FUNCTION, BLOCK, BLOCK], list(resolution.scope_kinds))
+        self.assertEqual([-1, 0, 1, 0, 3, 0], list(resolution.parents))
+        self.assertEqual([2, 0, 1, 1, 1, 1], list(resolution.references))
+        self.assertEqual({'y': 1}, resolution.globals)
+
+    def test_slots(self):
+        resolution = resolve(Parser().parse('def f(a, b) { let c; { let d; } } let e;'))
+        slots = dict(zip(resolution.names, resolution.slots))
+        self.assertEqual({'f': 0, 'e': 1, 'a': 0, 'b': 1, 'c': 2, 'd': 3}, slots)
+
+    def test_hoisting(self):
+        resolution = resolve(Parser().parse('def f() { return x; } let x = 1;'))
+        self.assertEqual(['f@0', 'x@1', 'x@1'], bindings(resolution))
+
+    def test_for(self):
+        resolution = resolve(Parser().parse('for (let i = 0; i < 3; i += 1) { i; } i;'))
+        self.assertEqual(['i@0', 'i@0', 'i@0', 'i@0', '*'], bindings(resolution))
+        self.assertEqual([PROGRAM, BLOCK, BLOCK], list(resolution.scope_kinds))
+
+    def test_classes(self):
+        resolution = resolve(Parser().parse('''
+            class A extends B { def get(x) { return this.x + x.y; } }
+            let a = new A(); a.get(1);
+        '''))
+        self.assertEqual(['A@0', '*', '.', 'x@2', '.', 'x@2', '.', 'a@1', 'A@0', 'a@1', '.'], bindings(resolution))
+        self.assertEqual(CLASS_NAME, resolution.binding_kinds[0])
+        with self.assertRaises(SyntaxError):
+            resolve(Parser().parse('class A { let x = 1; }'))
+
+    def test_computed_member(self):
+        resolution = resolve(Parser().parse('let a, i; a[i] = a.i;'))
+        self.assertEqual(['a@0', 'i@1', 'a@0', 'i@1', 'a@0', '.'], bindings(resolution))
+
+    def test_binding(self):
+        ast = Parser().parse('let x = 1; x;')
+        resolution = resolve(ast)
+        reference = ast['body'][1]['expression']
+        self.assertEqual(0, resolution.binding(reference))
+        self.assertIs(ast['body'][0]['declarations'][0]['id'], resolution.declaration(0))
+
+    def test_representations(self):
+        source = 'class P { def m(x) { return x; } } def f(x) { let y = x; return y; } f(1);'
+        expected = bindings(resolve(Parser().parse(source)))
+        self.assertEqual(expected, bindings(resolve(Parser(lazy=True).parse(source))))
+        resolution = resolve(Parser(hash_cons=True).parse(source))
+        self.assertEqual(expected, bindings(resolution))
+        with self.assertRaises(ValueError):
+            resolution.binding({'type': 'Identifier', 'name': 'x'})
+
+    def test_depth(self):
+        ast = Parser().parse('let x; x;')
+        block = ast['body'][1]
+        for _ in range(100000):
+            block = {'type': 'BlockStatement', 'body': [block]}
+        ast['body'][1] = block
+        self.assertEqual(['x@0', 'x@0'], bindings(resolve(ast)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from src.parser import Parser
+
+
+class SymbolTableTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.parser = Parser()
+
+    def test_identifiers_are_shared(self):
+        ast = self.parser.parse('value = value + other; other;')
+        expression = ast['body'][0]['expression']
+        self.assertIs(expression['left']['name'], expression['right']['left']['name'])
+        self.assertIs(expression['right']['right']['name'], ast['body'][1]['expression']['name'])
+        self.assertEqual({'value': 2, 'other': 2}, self.parser.symbols.identifiers)
+
+    def test_strings_are_shared(self):
+        ast = self.parser.parse('f("a", \'a\', "b", "a");')
+        arguments = ast['body'][0]['expression']['arguments']
+        self.assertEqual(['a', 'a', 'b', 'a'], [argument['value'] for argument in arguments])
+        self.assertIs(arguments[0]['value'], arguments[1]['value'])
+        self.assertIs(arguments[0]['value'], arguments[3]['value'])
+        self.assertEqual({'a': 3, 'b': 1}, self.parser.symbols.strings)
+
+    def test_table_per_parse(self):
+        self.parser.parse('x;')
+        self.parser.parse('y;')
+        self.assertEqual({'y': 1}, self.parser.symbols.identifiers)
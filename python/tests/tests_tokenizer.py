@@ -0,0 +1,137 @@
+import unittest
+from parameterized import parameterized
+from src import tokenizer
+from src.tokenizer import Tokenizer, TokenStream
+from tests_runner import fixtures
+
+
+def inputs() -> list:
+    return [[f"{file} {x['name']}", x['input']] for file, x in fixtures()]
+
+
+adversarial = [
+    ['unterminated comment', 'a /* b ' + 'x' * 1000],
+    ['unterminated comment openers', '/* ' * 300],
+    ['unterminated string', "a = 'b" + ' ' * 1000],
+    ['keyword prefixes', 'letter iffy do double classy thisx newer'],
+    ['adjacent number and identifier', '12abc 3let'],
+    ['operators', 'a/=b*=c<=d>=e==f!=!g&&h||i-j+k/*l*/m//n'],
+    ['unicode', 'x٣ ٣ a b'],
+]
+
+
+def tokens(string: str, engine: str) -> list:
+    tokenizer = Tokenizer(string, engine)
+    result = []
+    try:
+        while (token := tokenizer.get_next_token()) is not None:
+            result.append(token)
+    except SyntaxError as ex:
+        result.append(str(ex))
+    return result
+
+
+class TokenizerEngineTests(unittest.TestCase):
+
+    @parameterized.expand(inputs() + adversarial)
+    def test_dfa_matches_regex(self, name, string):
+        self.assertEqual(tokens(string, 'regex'), tokens(string, 'dfa'))
+
+    @parameterized.expand(inputs() + adversarial)
+    @unittest.skipIf(tokenizer.Prescan is None, 'NumPy is not installed')
+    def test_numpy_matches_regex(self, name, string):
+        self.assertEqual(tokens(string, 'regex'), tokens(string, 'numpy'))
+
+    @unittest.skipIf(tokenizer.Prescan is None, 'NumPy is not installed')
+    def test_numpy_window_boundaries(self):
+        string = 'let value  = identifier_name +  12345;\n' * 20
+        expected = tokens(string, 'regex')
+        for size in (1, 2, 3, 7, 64):
+            engine = Tokenizer(string, 'numpy')
+            engine._prescan._size = size
+            result = []
+            while (token := engine.get_next_token()) is not None:
+                result.append(token)
+            self.assertEqual(expected, result)
+
+    def test_dfa_memo_is_compact(self):
+        string = 'x /* ' + 'a' * 100000
+        engine = Tokenizer(string, 'dfa')
+        self.assertEqual(tokens(string, 'regex'), tokens(string, 'dfa'))
+        while engine.get_next_token() is not None:
+            pass
+        failed = engine._scanner._failed
+        self.assertEqual((1, len(string) + 1), (failed.itemsize, len(failed)))
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Tokenizer('', 'lalr')
+
+
+class TokenStreamTests(unittest.TestCase):
+
+    source = ' '.join(f'x{i}' for i in range(100))
+
+    def stream(self, source: str = source, batch: int = 4) -> TokenStream:
+        return TokenStream(Tokenizer(source), batch)
+
+    def test_peek(self):
+        stream = self.stream()
+        self.assertEqual('x0', stream.peek().value)
+        self.assertEqual('x10', stream.peek(10).value)
+        self.assertEqual('x0', stream.peek().value)
+        self.assertIsNone(stream.peek(100))
+
+    def test_advance(self):
+        stream = self.stream()
+        values = [stream.peek().value]
+        while (token := stream.advance()) is not None:
+            values.append(token.value)
+        self.assertEqual(self.source.split(), values)
+
+    def test_mark_reset(self):
+        stream = self.stream()
+        stream.advance()
+        mark = stream.mark()
+        for _ in range(50):
+            stream.advance()
+        self.assertEqual('x51', stream.peek().value)
+        stream.reset(mark)
+        self.assertEqual('x1', stream.peek().value)
+        self.assertEqual('x2', stream.advance().value)
+
+    def test_release(self):
+        stream = self.stream()
+        outer = stream.mark()
+        stream.advance()
+        inner = stream.mark()
+        stream.advance()
+        stream.release(inner)
+        stream.reset(outer)
+        self.assertEqual('x0', stream.peek().value)
+        with self.assertRaises(ValueError):
+            stream.reset(inner)
+
+    def test_error_at_position(self):
+        stream = self.stream('a b c # d')
+        self.assertEqual('c', stream.peek(2).value)
+        with self.assertRaises(SyntaxError):
+            stream.peek(3)
+
+    @parameterized.expand(inputs() + adversarial)
+    def test_batches_match_single_tokens(self, name, string):
+        for engine in ('regex', 'dfa'):
+            stream = TokenStream(Tokenizer(string, engine), 2)
+            result = []
+            try:
+                token = stream.peek()
+                while token is not None:
+                    result.append(token)
+                    token = stream.advance()
+            except SyntaxError as ex:
+                result.append(str(ex))
+            self.assertEqual(tokens(string, 'regex'), result)
+
+    def test_batch_size(self):
+        with self.assertRaises(ValueError):
+            self.stream(batch=3)
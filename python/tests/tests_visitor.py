@@ -0,0 +1,133 @@
+import unittest
+from src.parser import Parser
+from src.visitor import Visitor, Transformer, SKIP, STOP
+
+
+class Recorder(Visitor):
+
+    def __init__(self):
+        self.events = []
+
+    def visit_Identifier(self, node):
+        self.events.append(node['name'])
+
+    def visit_FunctionDeclaration(self, node):
+        self.events.append('function')
+
+    def leave_FunctionDeclaration(self, node):
+        self.events.append('/function')
+
+
+class Skipper(Recorder):
+
+    def visit_CallExpression(self, node):
+        return SKIP
+
+
+class Stopper(Recorder):
+
+    def visit_Identifier(self, node):
+        super().visit_Identifier(node)
+        if node['name'] == 'stop':
+            return STOP
+
+
+class Renamer(Transformer):
+
+    def leave_Identifier(self, node):
+        if node['name'] == 'x':
+            return {'type': 'Identifier', 'name': 'y'}
+        return node
+
+
+source = 'def f(a) { return a + g(b); } do { stop; c; } while (d);'
+
+
+class VisitorTests(unittest.TestCase):
+
+    def test_order(self):
+        visitor = Recorder()
+        self.assertTrue(visitor.walk(Parser().parse(source)))
+        self.assertEqual(['function', 'f', 'a', 'a', 'g', 'b', '/function', 'stop', 'c', 'd'], visitor.events)
+
+    def test_skip(self):
+        visitor = Skipper()
+        visitor.walk(Parser().parse(source))
+        self.assertEqual(['function', 'f', 'a', 'a', '/function', 'stop', 'c', 'd'], visitor.events)
+
+    def test_stop(self):
+        visitor = Stopper()
+        self.assertFalse(visitor.walk(Parser().parse(source)))
+        self.assertEqual(['function', 'f', 'a', 'a', 'g', 'b', '/function', 'stop'], visitor.events)
+
+    def test_representations(self):
+        expected = Recorder()
+        expected.walk(Parser().parse(source))
+        for parser in (Parser(hash_cons=True), Parser(lazy=True)):
+            visitor = Recorder()
+            visitor.walk(parser.parse(source))
+            self.assertEqual(expected.events, visitor.events)
+
+    def test_unknown_node_type(self):
+        node = {'type': 'Sequence', 'items': [{'type': 'Identifier', 'name': 'a'}], 'extra': 1,
+                'last': {'type': 'Identifier', 'name': 'b'}}
+        visitor = Recorder()
+        visitor.walk(node)
+        self.assertEqual(['a', 'b'], visitor.events)
+
+    def test_location_data(self):
+        loc = {'start': {'line': 1, 'column': 0}, 'end': {'line': 1, 'column': 1}}
+        node = {'type': 'Program', 'body': [{'type': 'X', 'loc': loc, 'range': [0, 1], 'spans': [loc],
+                                              'value': {'type': 'Identifier', 'name': 'x', 'loc': loc}}]}
+        visitor = Recorder()
+        self.assertTrue(visitor.walk(node))
+        self.assertEqual(['x'], visitor.events)
+        renamed = Renamer().transform(node)
+        self.assertEqual('y', renamed['body'][0]['value']['name'])
+        self.assertIs(loc, renamed['body'][0]['loc'])
+
+    def test_gaps(self):
+        node = {'type': 'Program', 'body': [{'type': 'X', 'items': [None, {'type': 'Identifier', 'name': 'x'}, None,
+                                                                    {'type': 'Identifier', 'name': 'z'}]}]}
+        visitor = Recorder()
+        self.assertTrue(visitor.walk(node))
+        self.assertEqual(['x', 'z'], visitor.events)
+        renamed = Renamer().transform(node)
+        self.assertEqual([None, {'type': 'Identifier', 'name': 'y'}, None, {'type': 'Identifier', 'name': 'z'}],
+                         renamed['body'][0]['items'])
+
+    def test_depth(self):
+        node = {'type': 'Identifier', 'name': 'x'}
+        for _ in range(100000):
+            node = {'type': 'UnaryExpression', 'operator': '!', 'argument': node}
+        visitor = Recorder()
+        visitor.walk(node)
+        self.assertEqual(['x'], visitor.events)
+        transformed = Renamer().transform(node)
+        for _ in range(100000):
+            transformed = transformed['argument']
+        self.assertEqual({'type': 'Identifier', 'name': 'y'}, transformed)
+
+    def test_transform(self):
+        ast = Parser().parse('let x = 1; f(x, z); z;')
+        transformed = Renamer().transform(ast)
+        self.assertEqual(Parser().parse('let y = 1; f(y, z); z;'), transformed)
+        self.assertEqual(Parser().parse('let x = 1; f(x, z); z;'), ast)
+        self.assertIs(ast['body'][2], transformed['body'][2])
+
+    def test_transform_unchanged(self):
+        ast = Parser().parse(source)
+        self.assertIs(ast, Renamer().transform(ast))
+
+    def test_transform_stop(self):
+        class StopAtZ(Renamer):
+            def visit_Identifier(self, node):
+                if node['name'] == 'z':
+                    return STOP
+
+        transformed = StopAtZ().transform(Parser().parse('x; z; x;'))
+        self.assertEqual(Parser().parse('y; z; x;'), transformed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+import errno
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+from parameterized import parameterized
+from src.parser import Parser
+from src.tokenizer import Tokenizer
+from src.watch import SourceFile, Watcher, _Inotify
+
+program = '''let a = 1;
+def f(x) {
+    return x * 2;
+}
+if (a) {
+    a = f(a);
+}
+// done
+class C extends B {
+    def m() { return 1; }
+}
+while (a < 10) a = a + 1;
+'''
+
+
+class SourceFileTests(unittest.TestCase):
+
+    def assertParsed(self, source: SourceFile, text: str):
+        tokens = []
+        Tokenizer(text).read_tokens(tokens, len(text) + 1)
+        self.assertEqual(Parser().parse(text)['body'], source.statements)
+        self.assertEqual(tokens, source.tokens)
+
+    @parameterized.expand([
+        ['edit inside a statement', 'return x * 2;', 'return x * 3 + 1;'],
+        ['add a statement', '// done\n', '// done\nlet b = a;\n'],
+        ['remove a statement', 'let a = 1;\n', ''],
+        ['add else', '    a = f(a);\n}\n', '    a = f(a);\n} else a = 0;\n'],
+        ['open a comment', '// done\nclass C extends B {\n    def m() { return 1; }\n}\n',
+         '/* done\nclass C extends B {\n    def m() { return 1; }\n} */\n'],
+        ['rename', 'class C', 'class Demo'],
+        ['append', 'a + 1;\n', 'a + 1;\nf(a);\n'],
+    ])
+    def test_update(self, name, old, new):
+        source = SourceFile()
+        source.update(program)
+        text = program.replace(old, new, 1)
+        source.update(text)
+        self.assertParsed(source, text)
+
+    def test_delta(self):
+        source = SourceFile()
+        delta = source.update(program)
+        self.assertEqual((0, 0, Parser().parse(program)['body']), tuple(delta))
+        delta = source.update(program.replace('x * 2', 'x * 3'))
+        self.assertEqual((1, 1), (delta.start, delta.removed))
+        self.assertEqual(['FunctionDeclaration'], [statement['type'] for statement in delta.inserted])
+
+    def test_else_extends_the_if(self):
+        text = 'if (a) b;\nc;\n'
+        source = SourceFile()
+        source.update(text)
+        delta = source.update(text.replace('b;', 'b; else d;'))
+        self.assertEqual((0, 1), (delta.start, delta.removed))
+        self.assertEqual('d', delta.inserted[0]['alternate']['expression']['name'])
+
+    def test_error_keeps_state(self):
+        source = SourceFile()
+        source.update(program)
+        with self.assertRaises(SyntaxError):
+            source.update(program.replace('let a = 1;', 'let a = 1 1;'))
+        self.assertParsed(source, program)
+        source.update(program.replace('let a = 1;', 'let a = 2;'))
+        self.assertParsed(source, program.replace('let a = 1;', 'let a = 2;'))
+
+    def test_numbers(self):
+        source = SourceFile(numbers='raw')
+        source.update('007;')
+        self.assertEqual('007', source.statements[0]['expression']['value'])
+
+    def test_random_edits(self):
+        rng = random.Random(0)
+        pieces = ['let z = 4;\n', 'f(1);\n', 'x', ' ', '\n', '+ 2', '}', '{', '"s"', '// c\n', ';', 'else ']
+        source = SourceFile()
+        source.update(program)
+        for _ in range(200):
+            text = source.text
+            start = rng.randrange(len(text) + 1)
+            end = min(len(text), start + rng.randrange(8))
+            edited = text[:start] + rng.choice(pieces) + text[end:]
+            try:
+                Parser().parse(edited)
+            except Exception:
+                continue
+            source.update(edited)
+            self.assertParsed(source, edited)
+
+
+class WatcherTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.path = os.path.join(self.root, 'a.lt')
+        self.write(self.path, 'let a = 1;\n')
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    @staticmethod
+    def write(path: str, text: str):
+        with open(path, 'w') as file:
+            file.write(text)
+        # Polling tells files apart by mtime and size; make sure they move.
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def changes(self, watcher: Watcher) -> list:
+        for _ in range(20):
+            events = watcher.changes(0.05)
+            if events:
+                return events
+        return []
+
+    def check(self, watcher: Watcher):
+        try:
+            self.assertEqual([{'file': self.path, 'start': 0, 'removed': 0,
+                               'inserted': Parser().parse('let a = 1;')['body']}], watcher.changes(0))
+
+            self.write(self.path, 'let a = 1;\nlet b = 2;\n')
+            [event] = self.changes(watcher)
+            # The last statement is parsed again: the token after it changed.
+            self.assertEqual((0, 1, 2), (event['start'], event['removed'], len(event['inserted'])))
+
+            self.write(self.path, 'let a = 1 1;\n')
+            [event] = self.changes(watcher)
+            self.assertTrue(event['error'].startswith('SyntaxError'))
+
+            os.mkdir(os.path.join(self.root, 'sub'))
+            other = os.path.join(self.root, 'sub', 'b.lt')
+            self.write(other, 'f();\n')
+            self.write(os.path.join(self.root, 'sub', 'b.txt'), 'not parsed')
+            events = self.changes(watcher)
+            if not events or events[0]['file'] != other:
+                events = self.changes(watcher)
+            self.assertEqual([other], [event['file'] for event in events])
+
+            os.remove(self.path)
+            self.assertEqual([{'file': self.path, 'deleted': True}], self.changes(watcher))
+            self.assertEqual([other], list(watcher.files))
+        finally:
+            watcher.close()
+
+    def test_poll(self):
+        self.check(Watcher(self.root, poll=True))
+
+    def test_inotify(self):
+        watcher = Watcher(self.root)
+        if watcher._inotify is None:
+            watcher.close()
+            self.skipTest('inotify is not available')
+        self.check(watcher)
+
+    def test_watch_limit(self):
+        full = OSError(errno.ENOSPC, 'inotify_add_watch failed')
+        with mock.patch.object(_Inotify, 'add', side_effect=full):
+            watcher = Watcher(self.root)
+        self.assertIsNone(watcher._inotify)
+        self.check(watcher)
+
+    def test_watch_limit_later(self):
+        watcher = Watcher(self.root)
+        if watcher._inotify is None:
+            watcher.close()
+            self.skipTest('inotify is not available')
+        self.assertEqual(1, len(watcher.changes(0)))
+        with mock.patch.object(_Inotify, 'add', side_effect=OSError(errno.ENOSPC, 'inotify_add_watch failed')):
+            os.mkdir(os.path.join(self.root, 'sub'))
+            other = os.path.join(self.root, 'sub', 'b.lt')
+            self.write(other, 'f();\n')
+            files = set()
+            for _ in range(5):
+                files.update(event['file'] for event in watcher.changes(0.05))
+        self.assertIsNone(watcher._inotify)
+        self.assertIn(other, files)
+        self.write(self.path, 'let a = 2;\n')
+        self.assertEqual([self.path], [event['file'] for event in self.changes(watcher)])
+        watcher.close()
+
+
+if __name__ == '__main__':
+    unittest.main()